@@ -20,9 +20,9 @@ def get_explanation(manufacturer, graph_type):
 # Add src folder to system path, as it's in a different folder from this file
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
 
-# Import aggregated_scores from random_forest_model.py
-from random_forest_model import aggregated_scores
-from ai_sentiment_analysis import update_cache_metadata
+# Charts are shown from their display-size variants when the build has written them
+from image_assets import display_variant
+from chart_data import forecast_spec, load_chart_data, powertrain_spec, rate_spec, yearly_line_spec
 
 # Set the page configuration
 st.set_page_config(page_title="Manufacturer Analysis", page_icon="📈", layout="wide")
@@ -35,6 +35,29 @@ st.write("Welcome to the Manufacturer Analysis page. Here you can explore sustai
 manufacturers = ['BMW', 'Ford', 'General Motors', 'Honda', 'Hyundai', 'Kia', 'Mazda', 'Mercedes', 'Nissan', 'Stellantis', 'Subaru', 'Toyota', 'Volkswagen']
 selected_manufacturer = st.selectbox("Select a Manufacturer:", manufacturers)
 
+# Interactive charts are drawn in the browser from a few KB of chart data; the static images are the pre-rendered PNGs
+chart_mode = st.radio("Chart mode:", ("Static images", "Interactive charts"), horizontal=True)
+chart_data = load_chart_data() if chart_mode == "Interactive charts" else None
+if chart_mode == "Interactive charts" and chart_data is None:
+    st.warning("Interactive chart data not found, showing the static images instead. Run `python src/chart_data.py` to build it.")
+
+# Rows of one chart data table for the selected manufacturer
+def manufacturer_chart_data(table):
+    """Return the selected manufacturer's rows of a chart data table, or None in static image mode."""
+    if chart_data is None:
+        return None
+    return chart_data['by_manufacturer'][table].get(selected_manufacturer)
+
+# Draw a chart in the browser from its chart data, or show its pre-rendered image
+def show_chart(plot_path, data=None, spec=None):
+    """Display one chart of the selected manufacturer in the current chart mode."""
+    if data is not None and not data.empty:
+        st.vega_lite_chart(data, spec, width="stretch")
+    elif os.path.exists(plot_path):
+        st.image(display_variant(plot_path, 1200), width=1200)
+    else:
+        st.error(f"Plot not found: {plot_path}")
+
 # Define file paths for respective graphs
 forecast_plot_path = f"manufacturer_forecast_plots/{selected_manufacturer}_forecast_plot.png"
 co2_plot_path = f"manufacturer_co2_mpg_plots/{selected_manufacturer}_co2_plot.png"
@@ -50,10 +73,7 @@ st.subheader(f"Analysis for {selected_manufacturer}")
 st.subheader("Sustainability Score Forecast")
 col1, col2 = st.columns([2, 0.8])
 with col1:
-    if os.path.exists(forecast_plot_path):
-        st.image(forecast_plot_path, width=1200)
-    else:
-        st.error(f"Plot not found: {forecast_plot_path}")
+    show_chart(forecast_plot_path, manufacturer_chart_data('forecasts'), forecast_spec())
 with col2:
     explanation = get_explanation(selected_manufacturer, "Sustainability Score")
     st.markdown(
@@ -71,10 +91,7 @@ with col2:
 st.subheader("Real-World CO2 Emissions Over Time")
 col1, col2 = st.columns([2, 0.8])
 with col1:
-    if os.path.exists(co2_plot_path):
-        st.image(co2_plot_path, width=1200)
-    else:
-        st.error(f"Plot not found: {co2_plot_path}")
+    show_chart(co2_plot_path, manufacturer_chart_data('co2_mpg'), yearly_line_spec('CO2', "CO2 Emissions (g/mi)", 'cyan'))
 with col2:
     explanation = get_explanation(selected_manufacturer, "CO2")
     st.markdown(
@@ -92,10 +109,7 @@ with col2:
 st.subheader("Real-World MPG Over Time")
 col1, col2 = st.columns([2, 0.8])
 with col1:
-    if os.path.exists(mpg_plot_path):
-        st.image(mpg_plot_path, width=1200)
-    else:
-        st.error(f"Plot not found: {mpg_plot_path}")
+    show_chart(mpg_plot_path, manufacturer_chart_data('co2_mpg'), yearly_line_spec('MPG', "Fuel Efficiency (MPG)", '#228B22'))
 with col2:
     explanation = get_explanation(selected_manufacturer, "MPG")
     st.markdown(
@@ -113,10 +127,7 @@ with col2:
 st.subheader("CO2 Reduction Rate Over Time")
 col1, col2 = st.columns([2, 0.8])
 with col1:
-    if os.path.exists(co2_reduction_rate_path):
-        st.image(co2_reduction_rate_path, width=1200)
-    else:
-        st.error(f"Plot not found: {co2_reduction_rate_path}")
+    show_chart(co2_reduction_rate_path, manufacturer_chart_data('scores'), rate_spec("CO2 Reduction Rate (%)", 'cyan'))
 with col2:
     explanation = get_explanation(selected_manufacturer, "CO2 Reduction")
     st.markdown(
@@ -134,10 +145,7 @@ with col2:
 st.subheader("MPG Growth Rate Over Time")
 col1, col2 = st.columns([2, 0.8])
 with col1:
-    if os.path.exists(mpg_growth_rate_path):
-        st.image(mpg_growth_rate_path, width=1200)
-    else:
-        st.error(f"Plot not found: {mpg_growth_rate_path}")
+    show_chart(mpg_growth_rate_path, manufacturer_chart_data('scores'), rate_spec("MPG Growth Rate (%)", '#228B22'))
 with col2:
     explanation = get_explanation(selected_manufacturer, "MPG Growth")
     st.markdown(
@@ -155,10 +163,8 @@ with col2:
 st.subheader("Powertrain Distribution")
 col1, col2 = st.columns([2, 0.8])
 with col1:
-    if os.path.exists(powertrain_pie_chart_path):
-        st.image(powertrain_pie_chart_path, width=1200)
-    else:
-        st.error(f"Plot not found: {powertrain_pie_chart_path}")
+    powertrain_colors = chart_data['powertrain_colors'] if chart_data is not None else {}
+    show_chart(powertrain_pie_chart_path, manufacturer_chart_data('powertrain'), powertrain_spec(powertrain_colors))
 with col2:
     explanation = get_explanation(selected_manufacturer, "Powertrain")
     st.markdown(
@@ -172,20 +178,70 @@ with col2:
         unsafe_allow_html=True
     )
 
-# AI Tool for Online Sentiment Analysis
-sustainability_score = aggregated_scores[
-    (aggregated_scores["Manufacturer"] == selected_manufacturer) &
-    (aggregated_scores["Model Year"] == 2024)
-]["Yearly Sustainability Score"].values[0]
+# What-if simulator for the manufacturer's powertrain mix and the score weighting
+st.subheader("🧪 What-If Scenario Simulator")
+if st.checkbox("Open the scenario simulator"):
+    # Scenarios use the closed-form score, which is cheap enough to recompute on every slider move
+    from scenario_simulator import available_years, baseline_mix, powertrain_weights, simulate
+
+    scenario_year = st.selectbox("Model Year:", available_years())
+    current_mix = baseline_mix(selected_manufacturer, scenario_year)
+
+    # Percentage-point changes to the low-emission powertrains; the rest of the mix shrinks or grows to compensate
+    share_changes = {}
+    slider_columns = st.columns(4)
+    for slider_column, col in zip(slider_columns, [
+        'Powertrain - Battery Electric Vehicle (BEV)',
+        'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)',
+        'Powertrain - Gasoline Strong Hybrid/HEV',
+        'Powertrain - Fuel Cell Electric Vehicle (FCEV)',
+    ]):
+        with slider_column:
+            label = col.replace('Powertrain - ', '')
+            change = st.slider(
+                f"{label} share change (points)", -100, 100, 0, step=1,
+                help=f"Current {scenario_year} share: {100 * current_mix[col]:.1f}%"
+            )
+            if change:
+                share_changes[col] = change / 100
+
+    # Optional overrides of the powertrain weights used for every manufacturer
+    weight_overrides = {}
+    with st.expander("Adjust powertrain weights"):
+        for col, weight in powertrain_weights.items():
+            new_weight = st.slider(col.replace('Powertrain - ', ''), 0.0, 1.0, float(weight), step=0.01)
+            if new_weight != weight:
+                weight_overrides[col] = new_weight
 
+    scenario = simulate(selected_manufacturer, scenario_year, share_changes, weight_overrides)
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric(
+            f"{scenario_year} Sustainability Score",
+            f"{scenario['scenario_score']:.2f}",
+            f"{scenario['scenario_score'] - scenario['baseline_score']:+.2f}"
+        )
+    with col2:
+        st.metric(
+            f"Rank among {scenario['manufacturers_ranked']} manufacturers",
+            f"#{scenario['scenario_rank']}",
+            f"{scenario['baseline_rank'] - scenario['scenario_rank']:+d} places"
+        )
+    st.dataframe(scenario['year_scores'], hide_index=True)
+
+# AI Tool for Online Sentiment Analysis
 st.subheader("🤖 AI Sentiment Analysis")
 if st.button("⚡ Run Sentiment Analysis"):
-    pdf_path = f"sustainability_reports/{selected_manufacturer} Sustainability Report.pdf"
+    # The scoring model and sentiment tooling are only loaded once an analysis is requested, so browsing the plots stays fast
+    from random_forest_model import get_scores_by_manufacturer
+    from ai_sentiment_analysis import report_available
 
-    # Invalidate and update cache
-    update_cache_metadata()
+    manufacturer_scores = get_scores_by_manufacturer()[selected_manufacturer]
+    sustainability_score = manufacturer_scores[manufacturer_scores["Model Year"] == 2024]["Yearly Sustainability Score"].values[0]
+
+    pdf_path = f"sustainability_reports/{selected_manufacturer} Sustainability Report.pdf"
 
-    if os.path.exists(pdf_path):
+    if report_available(pdf_path):
         with st.spinner("Running sentiment analysis. Please be patient, this may take a few moments..."):
             from ai_sentiment_analysis import main as sentiment_analysis
             final_score, explanation = sentiment_analysis(selected_manufacturer, sustainability_score, pdf_path=pdf_path)
@@ -1,18 +1,33 @@
+import hashlib
 import logging
+import os
 import praw
-from transformers import pipeline
 import pdfplumber
+import re
 import json
-import os
+import time
 from datetime import datetime
-from random_forest_model import aggregated_scores
+from functools import lru_cache
+from joblib import Parallel, delayed
+from pdfminer.pdftypes import PDFStream, resolve1
+from pdfminer.psparser import LIT
+from document_store import DOCUMENT_STORE_DIR, load_document, save_document
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize sentiment analysis model
-sentiment_model = pipeline("sentiment-analysis", model="distilbert-base-uncased-finetuned-sst-2-english", device=0)
+# Sentiment analysis model, loaded on first use so importing this module does not pull in transformers or torch
+SENTIMENT_MODEL_ID = "distilbert-base-uncased-finetuned-sst-2-english"
+
+@lru_cache(maxsize=None)
+def get_sentiment_model():
+    """Build the DistilBERT sentiment pipeline on first use, on the GPU when one is available."""
+    import torch
+    from transformers import pipeline
+
+    device = 0 if torch.cuda.is_available() else -1
+    return pipeline("sentiment-analysis", model=SENTIMENT_MODEL_ID, device=device)
 
 # Reddit API configuration
 REDDIT_CLIENT_ID = "aSl7D2IUWFvvys1NHnH2RA"
@@ -23,19 +38,6 @@ REDDIT_USER_AGENT = "CarbonLensApp/1.0 by Physical_Mix5167"
 CACHE_VERSION = "1.0"  # Update this whenever the model or logic changes
 CACHE_TIMESTAMP = "cache_timestamp.json"
 
-# Check if cache is valid
-def is_cache_valid(cache_file):
-    if not os.path.exists(cache_file):
-        return False
-
-    try:
-        with open(CACHE_TIMESTAMP, "r") as f:
-            cache_metadata = json.load(f)
-            return cache_metadata.get("version") == CACHE_VERSION
-    except Exception as e:
-        logger.error(f"Error reading cache metadata: {e}")
-        return False
-
 # Update cache metadata
 def update_cache_metadata():
     metadata = {
@@ -47,19 +49,14 @@ def update_cache_metadata():
 
 
 # Prefetch Reddit posts and cache results
-def prefetch_reddit_posts(manufacturer, limit=50, cache_file="reddit_cache.json"):
+def prefetch_reddit_posts(manufacturer, limit=50, store_dir=DOCUMENT_STORE_DIR):
     logger.info(f"Prefetching Reddit posts for {manufacturer}...")
-    cache = {}
-
-    # Load cache if valid
-    if is_cache_valid(cache_file):
-        with open(cache_file, "r") as f:
-            cache = json.load(f)
 
     # Return cached data if available
-    if manufacturer in cache:
+    document = load_document("reddit", manufacturer, CACHE_VERSION, store_dir)
+    if document is not None:
         logger.info(f"Using cached Reddit posts for {manufacturer}.")
-        return cache[manufacturer]
+        return document["content"]
 
     # Fetch posts from Reddit
     reddit = praw.Reddit(
@@ -80,79 +77,279 @@ def prefetch_reddit_posts(manufacturer, limit=50, cache_file="reddit_cache.json"
         logger.error(f"Error fetching Reddit posts: {e}")
 
     # Update cache
-    cache[manufacturer] = posts
-    with open(cache_file, "w") as f:
-        json.dump(cache, f)
+    save_document("reddit", manufacturer, CACHE_VERSION, posts, store_dir, limit=limit)
     update_cache_metadata()
 
     logger.info(f"Successfully fetched {len(posts)} posts for {manufacturer}.")
     return posts
 
-# Prefetch and cache PDF processing
-def prefetch_pdf_text(pdf_path, cache_file="pdf_cache.json"):
-    logger.info(f"Prefetching PDF text for {pdf_path}...")
-    cache = {}
-
-    # Load cache if valid
-    if is_cache_valid(cache_file):
-        with open(cache_file, "r") as f:
-            cache = json.load(f)
-
-    # Return cached data if available
-    if pdf_path in cache:
-        logger.info(f"Using cached PDF text for {pdf_path}.")
-        return cache[pdf_path], cache.get("num_pages", 0)
+# Keywords a PDF paragraph must contain to be analyzed. Each one matches the words it starts, so "recycle" also
+# matches "recycled" and "emissions" matches "emissions-free"
+pdf_keywords = [
+    "sustainability", "carbon", "emissions", "initiatives",
+    "resource", "responsible", "electric", "recycle",
+    "renewable", "impact", "decarbonisation", "decarbonization"
+]
+
+# Keywords too short to match as word starts, which only match as whole words or with a plural "s": "ev" matches
+# "EV" and "EVs", but not "every" or "development", and the powertrain acronyms that end in EV are listed alongside it
+pdf_whole_word_keywords = ["ev", "bev", "phev", "hev", "xev"]
+
+# Pages each pool task extracts. Every task opens its own handle on the PDF, so larger ranges spend less time
+# opening it, while smaller ones stream their first paragraphs sooner.
+PAGES_PER_TASK = 16
+
+# Worker processes PDF pages are extracted on; -1 uses every core
+N_JOBS = -1
+
+# Subtype of the XObjects that hold page content of their own, such as text
+LITERAL_FORM = LIT("Form")
+
+# Compile the keywords into one pattern, once per keyword set, so each line is scanned a single time instead of once
+# per keyword. Longer keywords come first, so a keyword never hides a longer one it starts.
+@lru_cache(maxsize=None)
+def _compile_keywords(keywords, whole_word_keywords):
+    alternatives = []
+    if keywords:
+        prefixes = sorted({keyword.lower() for keyword in keywords}, key=len, reverse=True)
+        alternatives.append(rf"\b(?:{'|'.join(map(re.escape, prefixes))})")
+    if whole_word_keywords:
+        words = sorted({keyword.lower() for keyword in whole_word_keywords}, key=len, reverse=True)
+        alternatives.append(rf"\b(?:{'|'.join(map(re.escape, words))})s?\b")
+    return re.compile("|".join(alternatives) or r"(?!)")
+
+def keyword_matcher(keywords=pdf_keywords, whole_word_keywords=pdf_whole_word_keywords):
+    """Return a compiled pattern whose `search` finds the keywords, given as any iterables, in lowercase text."""
+    return _compile_keywords(tuple(keywords), tuple(whole_word_keywords))
+
+# Keep the lines of a page's text that contain a keyword; any object with a `search` method over lowercase text,
+# such as an Aho-Corasick automaton, can stand in for the compiled pattern
+def filter_paragraphs(text, matcher=None):
+    """Return the relevant paragraphs of a page's text and the number of non-empty lines dropped."""
+    search = (matcher or keyword_matcher()).search
+    paragraphs, dropped = [], 0
+    for paragraph in text.split("\n"):
+        if search(paragraph.lower()):
+            paragraphs.append(paragraph)
+        elif paragraph.strip():
+            dropped += 1
+    return paragraphs, dropped
+
+# A page's fingerprint covers everything its extracted text depends on: its geometry, its content streams, the fonts
+# that map them to characters and the form XObjects it draws, so a page reissued unchanged in a revised report keeps it
+def _page_hash(page):
+    digest = hashlib.sha256(repr((page.mediabox, page.cropbox, page.rotate)).encode("utf-8"))
+    seen = set()
+
+    def update_resources(resources):
+        resources = resolve1(resources) or {}
+        fonts = resolve1(resources.get("Font")) or {}
+        for name in sorted(fonts):
+            font = resolve1(fonts[name])
+            if not isinstance(font, dict):
+                continue
+            encoding = resolve1(font.get("Encoding"))
+            if isinstance(encoding, PDFStream):
+                encoding = encoding.get_data()
+            digest.update(repr((name, font.get("BaseFont"), encoding)).encode("utf-8"))
+            to_unicode = resolve1(font.get("ToUnicode"))
+            if isinstance(to_unicode, PDFStream):
+                digest.update(to_unicode.get_data())
+        xobjects = resolve1(resources.get("XObject")) or {}
+        for name in sorted(xobjects):
+            xobject = resolve1(xobjects[name])
+            if isinstance(xobject, PDFStream) and xobject.get("Subtype") is LITERAL_FORM and id(xobject) not in seen:
+                seen.add(id(xobject))
+                digest.update(xobject.get_data())
+                update_resources(xobject.get("Resources"))
+
+    contents = page.contents if isinstance(page.contents, list) else [page.contents]
+    for stream in contents:
+        stream = resolve1(stream)
+        if isinstance(stream, PDFStream):
+            digest.update(stream.get_data())
+    update_resources(page.resources)
+    return digest.hexdigest()
+
+def pdf_page_hashes(pdf_path):
+    """Return the content hash of every page of a PDF, in page order."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [_page_hash(page.page_obj) for page in pdf.pages]
+
+# Extract the text of some pages (0-based) inside a worker
+def _extract_pages(pdf_path, page_numbers):
+    texts = []
+    with pdfplumber.open(pdf_path, pages=[number + 1 for number in page_numbers]) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text() or "")
+            page.close()  # Free the page's parsed objects before the next one
+    return texts
+
+# Split the pages into batches in page order: runs of pages whose text is already stored, and runs of up to
+# `pages_per_task` pages that still have to be extracted
+def _page_batches(cached_texts, pages_per_task):
+    batches = []
+    for number, text in enumerate(cached_texts):
+        missing = text is None
+        if not batches or batches[-1][0] != missing or (missing and len(batches[-1][1]) == pages_per_task):
+            batches.append((missing, []))
+        batches[-1][1].append(number)
+    return batches
+
+# Yield a PDF's pages batch by batch, reading unchanged pages from the store and extracting the others on the pool,
+# storing each extracted page under its content hash as soon as its batch is done
+def _stream_pages(pdf_path, pdf_key, page_hashes, store_dir, n_jobs, pages_per_task, matcher):
+    cached_texts = []
+    for page_hash in page_hashes:
+        document = load_document("pdf_page", page_hash, CACHE_VERSION, store_dir)
+        cached_texts.append(None if document is None else document["content"])
+    batches = _page_batches(cached_texts, pages_per_task)
+    missing_batches = [numbers for missing, numbers in batches if missing]
+    extracted_pages = sum(len(numbers) for numbers in missing_batches)
+    if extracted_pages:
+        logger.info(f"Extracting {extracted_pages} of {len(page_hashes)} pages of {pdf_path}; the others are unchanged.")
+
+    start = time.perf_counter()
+    kept, dropped = 0, 0
+    try:
+        extracted = Parallel(n_jobs=n_jobs, return_as="generator")(
+            delayed(_extract_pages)(pdf_path, numbers) for numbers in missing_batches
+        )
+        for missing, numbers in batches:
+            texts = next(extracted) if missing else [cached_texts[number] for number in numbers]
+            if missing:
+                for number, text in zip(numbers, texts):
+                    save_document("pdf_page", page_hashes[number], CACHE_VERSION, text, store_dir)
+            batch = []
+            for number, text in zip(numbers, texts):
+                paragraphs, page_dropped = filter_paragraphs(text, matcher)
+                batch.append((page_hashes[number], paragraphs))
+                kept += len(paragraphs)
+                dropped += page_dropped
+            yield batch
+    except Exception as e:
+        logger.error(f"Error extracting text from PDF: {e}")
+        return
+    seconds = time.perf_counter() - start
+    logger.info(f"Kept {kept} of {kept + dropped} lines of {pdf_path} with a keyword; dropped {dropped}.")
+
+    # Every page is stored now, so the next run of this file goes straight to its pages. A page list that is already
+    # stored is left as it is, so reading a committed report does not rewrite its document.
+    if extracted_pages or load_document("pdf", pdf_key, CACHE_VERSION, store_dir) is None:
+        save_document("pdf", pdf_key, CACHE_VERSION, page_hashes, store_dir, path=pdf_path, num_pages=len(page_hashes))
+    if extracted_pages:
+        update_cache_metadata()
+        logger.info(
+            f"PDF text extraction and caching completed. Pages: {extracted_pages} in {seconds:.1f}s "
+            f"({extracted_pages / seconds if seconds else 0:.1f} pages/sec)"
+        )
+
+# Stream the pages of a PDF with their relevant paragraphs, extracting only pages that are not in the store yet
+def stream_pdf_pages(pdf_path, store_dir=DOCUMENT_STORE_DIR, n_jobs=N_JOBS, pages_per_task=PAGES_PER_TASK, matcher=None):
+    """Return the PDF's page count and a generator of batches of (page hash, relevant paragraphs), in page order.
+
+    The PDF is cached under the hash of its contents and each page's text under the hash of its own content, so a
+    revised report only has its changed pages extracted, on a process pool; every batch is yielded as soon as it is
+    ready, so the caller can start on it while later pages are still being read. Paragraphs are kept when `matcher`
+    (`keyword_matcher()` by default) finds a keyword in them.
+    """
+    from data_processing import file_hash
 
-    # Extract text from PDF and get number of pages
-    text_chunks = []
-    num_pages = 0
+    logger.info(f"Prefetching PDF text for {pdf_path}...")
+    # A report whose PDF is not bundled is served from the paragraphs migrated from the old PDF cache, as one batch
+    if not os.path.exists(pdf_path):
+        document = load_document("pdf_legacy", pdf_path, CACHE_VERSION, store_dir)
+        if document is not None:
+            logger.info(f"Using the migrated text of {pdf_path}.")
+            return document.get("num_pages") or 0, iter([[(None, document["content"])]])
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            num_pages = len(pdf.pages)  # Get the number of pages
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    paragraphs = text.split("\n")
-                    for paragraph in paragraphs:
-                        if any(keyword in paragraph.lower() for keyword in [
-                            "sustainability", "carbon", "emissions", "initiatives", 
-                            "resource", "responsible", "electric", "recycle", 
-                            "renewable", "impact", "decarbonisation", "ev"
-                        ]):
-                            text_chunks.append(paragraph)
+        pdf_key = file_hash(pdf_path)
+        document = load_document("pdf", pdf_key, CACHE_VERSION, store_dir)
+        if document is not None:
+            logger.info(f"Using cached page hashes for {pdf_path}.")
+            page_hashes = document["content"]
+        else:
+            page_hashes = pdf_page_hashes(pdf_path)
     except Exception as e:
         logger.error(f"Error extracting text from PDF: {e}")
+        return 0, iter([])
+    return len(page_hashes), _stream_pages(pdf_path, pdf_key, page_hashes, store_dir, n_jobs, pages_per_task, matcher)
 
-    # Update cache
-    cache[pdf_path] = text_chunks
-    cache["num_pages"] = num_pages
-    with open(cache_file, "w") as f:
-        json.dump(cache, f)
-    update_cache_metadata()
+def report_available(pdf_path, store_dir=DOCUMENT_STORE_DIR):
+    """Return whether a report can be analyzed: its PDF is bundled or its migrated text is stored."""
+    return os.path.exists(pdf_path) or load_document("pdf_legacy", pdf_path, CACHE_VERSION, store_dir) is not None
 
-    logger.info(f"PDF text extraction and caching completed. Pages: {num_pages}")
-    return text_chunks, num_pages
+# Stream the relevant paragraphs of a PDF, from the cache or from a parallel extraction
+def stream_pdf_text(pdf_path, store_dir=DOCUMENT_STORE_DIR, n_jobs=N_JOBS):
+    """Return the PDF's page count and a generator of its relevant paragraphs, in page order, one batch per page range."""
+    num_pages, page_batches = stream_pdf_pages(pdf_path, store_dir, n_jobs)
+    return num_pages, ([paragraph for _, paragraphs in batch for paragraph in paragraphs] for batch in page_batches)
+
+# Prefetch and cache PDF processing
+def prefetch_pdf_text(pdf_path, store_dir=DOCUMENT_STORE_DIR, n_jobs=N_JOBS):
+    num_pages, batches = stream_pdf_text(pdf_path, store_dir, n_jobs)
+    return [paragraph for batch in batches for paragraph in batch], num_pages
+
+# Weight the sentiment of a text: positives count up to 3, negatives down to -2.4
+def _sentiment_weight(label, score):
+    if label == "POSITIVE":
+        return min(score * 3.0, 3.0)  # Cap strong positives
+    if label == "NEGATIVE":
+        return max(-score * 2.4, -2.4)  # Cap strong negatives
+    return None
+
+# Key of a text's memoized sentiment: the model and a hash of the text, so a text is classified once per model
+def _sentiment_key(text):
+    return f"{SENTIMENT_MODEL_ID}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+def classify_texts(texts, store_dir=DOCUMENT_STORE_DIR):
+    """Return the (label, score) of every text and the number of memo hits, running the model only on unseen texts."""
+    keys = [_sentiment_key(text) for text in texts]
+    results = {}
+    for key in keys:
+        if key not in results:
+            document = load_document("sentiment", key, CACHE_VERSION, store_dir)
+            results[key] = None if document is None else tuple(document["content"])
+    hits = sum(results[key] is not None for key in keys)
+
+    # Classify each unseen text once, even when it occurs several times, and memoize it straight away
+    unseen = {key: text for key, text in zip(keys, texts) if results[key] is None}
+    if unseen:
+        predictions = get_sentiment_model()(list(unseen.values()), truncation=True, batch_size=16)
+        for key, prediction in zip(unseen, predictions):
+            results[key] = (prediction["label"], prediction["score"])
+            save_document("sentiment", key, CACHE_VERSION, list(results[key]), store_dir)
+    return [results[key] for key in keys], hits
 
 # Analyze sentiment
-def analyze_sentiment(text_chunks):
+def analyze_sentiment(text_chunks, store_dir=DOCUMENT_STORE_DIR):
+    return analyze_sentiment_stream([text_chunks], store_dir)[0]
+
+# Analyze batches of text as they arrive, so inference on the first batches overlaps the extraction of later ones
+def analyze_sentiment_stream(batches, store_dir=DOCUMENT_STORE_DIR):
+    """Return the mean sentiment weight over every text in the batches, and the number of texts.
+
+    Texts classified before, by the same model, are read back from the sentiment memo instead of going through the
+    model again; the memo's hits and misses are logged.
+    """
     logger.info("Analyzing sentiment for text chunks...")
+    total, count, hits, misses = 0.0, 0, 0, 0
     try:
-        results = sentiment_model(text_chunks, truncation=True, batch_size=16)
-        sentiment_scores = []
-
-        for result in results:
-            if result["label"] == "POSITIVE":
-                weight = min(result["score"] * 3.0, 3.0)  # Cap strong positives
-                sentiment_scores.append(weight)
-            elif result["label"] == "NEGATIVE":
-                weight = max(-result["score"] * 2.4, -2.4)  # Cap strong negatives
-                sentiment_scores.append(weight)
-
-        logger.info("Sentiment analysis completed.")
-        return sum(sentiment_scores) / len(sentiment_scores) if sentiment_scores else 0
+        for batch in batches:
+            if not batch:
+                continue
+            results, batch_hits = classify_texts(batch, store_dir)
+            hits += batch_hits
+            misses += len(batch) - batch_hits
+            weights = [weight for weight in (_sentiment_weight(*result) for result in results) if weight is not None]
+            total += sum(weights)
+            count += len(weights)
+
+        logger.info(f"Sentiment analysis completed; {hits} memo hits, {misses} misses.")
+        return (total / count if count else 0), count
     except Exception as e:
         logger.error(f"Error during sentiment analysis: {e}")
-        return 0
+        return 0, count
 
 # Adjust sustainability score with balanced scaling
 def adjust_sustainability_score(base_score, pdf_sentiment, reddit_sentiment, num_reddit_posts):
@@ -226,14 +423,16 @@ def generate_dynamic_explanation(manufacturer, base_score, final_score, pdf_sent
 # Main function for analysis
 def main(manufacturer, base_score, pdf_path=None):
     reddit_posts = prefetch_reddit_posts(manufacturer)
-    pdf_text_chunks, pdf_pages = prefetch_pdf_text(pdf_path) if pdf_path else ([], 0)
 
-    if not reddit_posts and not pdf_text_chunks:
+    # The PDF's paragraphs are scored batch by batch while the rest of the report is still being extracted
+    pdf_pages, pdf_batches = stream_pdf_text(pdf_path) if pdf_path else (0, iter([]))
+    pdf_sentiment, num_pdf_chunks = analyze_sentiment_stream(pdf_batches)
+
+    if not reddit_posts and not num_pdf_chunks:
         logger.warning("No relevant texts found for analysis.")
         return base_score, "No relevant data to adjust the sustainability score."
 
     reddit_sentiment = analyze_sentiment(reddit_posts)
-    pdf_sentiment = analyze_sentiment(pdf_text_chunks)
 
     num_reddit_posts = len(reddit_posts)
     final_score = adjust_sustainability_score(base_score, pdf_sentiment, reddit_sentiment, num_reddit_posts)
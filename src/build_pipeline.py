@@ -0,0 +1,213 @@
+import argparse
+import ast
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import pandas as pd
+from chart_data import CHART_DATA_PATH
+from data_processing import CACHE_DIR, EMISSIONS_CSV, file_hash
+from document_store import DOCUMENT_STORE_DIR
+from forecast_store import FORECAST_TABLE
+from model_registry import MODEL_DIR
+from prefetch_reports import report_paths
+
+# Directory of the stage scripts and the local modules they import
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Fingerprint of the inputs each stage last succeeded with
+BUILD_MANIFEST_PATH = os.path.join(CACHE_DIR, "build_manifest.json")
+
+# The offline build as a DAG: each stage is a src script, the stages it needs first, the data files it reads and the
+# outputs that must exist for it to be skipped
+stages = {
+    'data_processing': {'after': [], 'inputs': [EMISSIONS_CSV], 'outputs': []},
+    'random_forest_model': {'after': ['data_processing'], 'inputs': [], 'outputs': [MODEL_DIR]},
+    'visualizations': {'after': ['data_processing'], 'inputs': [], 'outputs': ["manufacturer_co2_mpg_plots"]},
+    'future_predictions': {'after': ['random_forest_model'], 'inputs': [], 'outputs': [FORECAST_TABLE, "manufacturer_forecast_plots"]},
+    'manufacturer_advanced_visuals': {'after': ['random_forest_model'], 'inputs': [], 'outputs': ["manufacturer_advanced_visuals"]},
+    'chart_data': {'after': ['random_forest_model', 'future_predictions'], 'inputs': [], 'outputs': [CHART_DATA_PATH]},
+    'prefetch_reports': {'after': [], 'inputs': report_paths(), 'outputs': [DOCUMENT_STORE_DIR]},
+}
+
+# Stages run at the same time, each in its own interpreter
+MAX_WORKERS = 3
+
+# Cores each stage's worker pools may use when `max_workers` stages run at once. The stages size their pools with
+# n_jobs=-1, which joblib caps at LOKY_MAX_CPU_COUNT, so concurrent stages share the cores instead of oversubscribing them.
+def stage_cpu_count(max_workers=MAX_WORKERS):
+    """Return the number of cores each concurrently running stage gets."""
+    return max(1, (os.cpu_count() or 1) // max_workers)
+
+# The src modules a module imports; imports inside functions are only followed when `in_functions` is set
+def _local_imports(module, in_functions):
+    path = os.path.join(SRC_DIR, f"{module}.py")
+    with open(path) as f:
+        nodes = [ast.parse(f.read(), path)]
+    names = set()
+    while nodes:
+        node = nodes.pop()
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module.split('.')[0])
+        elif in_functions or not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            nodes.extend(ast.iter_child_nodes(node))
+    return {name for name in names if os.path.exists(os.path.join(SRC_DIR, f"{name}.py"))}
+
+# A stage's code is its script, including the modules its functions import lazily, plus every src module those
+# import at module level, directly or through other src modules
+def source_closure(module):
+    """Return the sorted names of the src modules a stage script depends on, itself included."""
+    closure, pending = {module}, list(_local_imports(module, in_functions=True))
+    while pending:
+        name = pending.pop()
+        if name not in closure:
+            closure.add(name)
+            pending.extend(_local_imports(name, in_functions=False) - closure)
+    return sorted(closure)
+
+def stage_fingerprints(stage_names=None):
+    """Return the fingerprint of every stage: a hash of its code, its data files and the fingerprints of its upstream stages."""
+    fingerprints = {}
+    for name in topological_order(stage_names):
+        digest = hashlib.sha256(name.encode("utf-8"))
+        for module in source_closure(name):
+            digest.update(f"{module}:{file_hash(os.path.join(SRC_DIR, f'{module}.py'))}".encode("utf-8"))
+        for path in stages[name]['inputs']:
+            digest.update(f"{path}:{file_hash(path) if os.path.exists(path) else None}".encode("utf-8"))
+        for upstream in stages[name]['after']:
+            digest.update(fingerprints[upstream].encode("utf-8"))
+        fingerprints[name] = digest.hexdigest()
+    return fingerprints
+
+# Order the requested stages, and every stage they need, so each comes after its upstream stages
+def topological_order(stage_names=None):
+    """Return the requested stages (all by default) with their upstream stages, in dependency order."""
+    order, visiting = [], set()
+
+    def visit(name):
+        if name in order:
+            return
+        if name in visiting:
+            raise ValueError(f"Build stages form a cycle through {name}")
+        visiting.add(name)
+        for upstream in stages[name]['after']:
+            visit(upstream)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in stage_names or stages:
+        visit(name)
+    return order
+
+def load_build_manifest(manifest_path=BUILD_MANIFEST_PATH):
+    """Return the stage fingerprints of the last successful runs."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def save_build_manifest(manifest, manifest_path=BUILD_MANIFEST_PATH):
+    """Atomically save the stage fingerprints."""
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+# Run one stage script in a fresh interpreter from the current directory, which the data paths are relative to,
+# with its worker pools limited to its share of the cores
+def _run_stage(name, cpu_count):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [SRC_DIR, env.get("PYTHONPATH")]))
+    env["LOKY_MAX_CPU_COUNT"] = str(cpu_count)
+    start = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, os.path.join(SRC_DIR, f"{name}.py")], env=env, capture_output=True, text=True
+    )
+    return completed.returncode, completed.stdout + completed.stderr, time.perf_counter() - start
+
+def run_build(stage_names=None, force=False, max_workers=MAX_WORKERS, dry_run=False):
+    """Run the stages whose fingerprint changed, independent ones concurrently, and return a per-stage report.
+
+    A stage is skipped when the manifest holds its current fingerprint and its outputs exist; `force` runs every
+    stage. Stages downstream of a failed stage are not run. Each stage's worker pools get `stage_cpu_count(max_workers)`
+    cores.
+    """
+    order = topological_order(stage_names)
+    fingerprints = stage_fingerprints(stage_names)
+    manifest = load_build_manifest()
+    stale = {
+        name for name in order
+        if force or manifest.get(name) != fingerprints[name] or not all(os.path.exists(path) for path in stages[name]['outputs'])
+    }
+
+    results = {name: ('skipped', 0.0) for name in order if name not in stale}
+    if dry_run:
+        results.update({name: ('stale', 0.0) for name in stale})
+        return pd.DataFrame([(name, *results[name]) for name in order], columns=['Stage', 'Status', 'Seconds'])
+
+    running = {}
+    cpu_count = stage_cpu_count(max_workers)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(results) < len(order):
+            for name in order:
+                if name in results or name in running.values():
+                    continue
+                upstream_status = [results.get(upstream, ('pending',))[0] for upstream in stages[name]['after']]
+                if any(status in ('failed', 'blocked') for status in upstream_status):
+                    results[name] = ('blocked', 0.0)
+                elif all(status in ('ran', 'skipped') for status in upstream_status):
+                    print(f"Starting {name}", flush=True)
+                    running[executor.submit(_run_stage, name, cpu_count)] = name
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                returncode, output, seconds = future.result()
+                if returncode == 0:
+                    results[name] = ('ran', seconds)
+                    manifest[name] = fingerprints[name]
+                    save_build_manifest(manifest)
+                else:
+                    results[name] = ('failed', seconds)
+                    manifest.pop(name, None)
+                    save_build_manifest(manifest)
+                print(f"--- {name} {results[name][0]} in {seconds:.1f}s ---\n{output.rstrip()}", flush=True)
+
+    return pd.DataFrame([(name, *results[name]) for name in order], columns=['Stage', 'Status', 'Seconds'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline build: every stage whose code or data changed, independent stages in parallel.")
+    parser.add_argument("stages", nargs="*", help=f"Stages to build, with the stages they need; all by default. One of: {', '.join(stages)}.")
+    parser.add_argument("--force", action="store_true", help="Run every stage, even when its inputs are unchanged.")
+    parser.add_argument("--max-workers", type=int, default=MAX_WORKERS, help="Stages run at the same time.")
+    parser.add_argument("--dry-run", action="store_true", help="Only print which stages would run.")
+    args = parser.parse_args()
+    unknown = [name for name in args.stages if name not in stages]
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(unknown)}")
+
+    start = time.perf_counter()
+    report = run_build(args.stages or None, args.force, args.max_workers, args.dry_run)
+    wall_seconds = time.perf_counter() - start
+
+    print(report.to_string(index=False))
+    if args.dry_run:
+        print(f"{(report['Status'] == 'stale').sum()} stages would run; {(report['Status'] == 'skipped').sum()} are unchanged")
+        return
+    ran = report[report['Status'] == 'ran']
+    print(
+        f"Ran {len(ran)} stages in {wall_seconds:.1f}s wall time ({ran['Seconds'].sum():.1f}s of stage time); "
+        f"skipped {(report['Status'] == 'skipped').sum()} unchanged stages"
+    )
+    sys.exit(1 if report['Status'].isin(['failed', 'blocked']).any() else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+import argparse
+import os
+import time
+import pandas as pd
+from data_cleaning import clean_emissions_data, measurement_columns, powertrain_columns
+from sustainability_score import columns_to_normalize, exact_sustainability_scores, get_exact_scored_data, get_score_bounds
+
+# Columns every input row needs to be scored
+required_columns = columns_to_normalize + powertrain_columns
+
+# Columns written as floats: the ones clean_emissions_data parses and the scores; every other column is passed
+# through as the string it was read as
+score_columns = ['Sustainability Score', 'Sustainability Score (Normalized)']
+float_columns = measurement_columns + powertrain_columns + score_columns
+
+# Rows read, scored and written per chunk
+DEFAULT_CHUNKSIZE = 100_000
+
+# Build a scoring function for one chunk, plus the EPA score range used to put bulk scores on the dashboard's 0-100 scale
+def make_scorer(backend):
+    """Return `(score_chunk, (low, high))` for the 'random_forest' or 'exact' backend."""
+    if backend == 'exact':
+        bounds = get_score_bounds()
+        reference = get_exact_scored_data()['Sustainability Score']
+
+        def score_chunk(chunk):
+            return exact_sustainability_scores(chunk, bounds)
+    else:
+        from random_forest_model import engineer_features, get_scored_data, get_trained_model
+        artifact = get_trained_model()
+        reference = get_scored_data()['Predicted Sustainability Score']
+
+        def score_chunk(chunk):
+            engineered, _ = engineer_features(chunk, artifact)
+            return artifact['model'].predict(engineered[artifact['features']])
+
+    return score_chunk, (reference.min(), reference.max())
+
+# Append one scored chunk to a CSV or Parquet output
+class _ChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self.parquet_writer = None
+        self.rows_written = 0
+
+    def write(self, chunk):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # The schema is fixed up front from the column names rather than inferred from the first chunk, where a
+            # column that happens to be all blank would be typed null and reject the values of later chunks
+            if self.parquet_writer is None:
+                schema = pa.schema([
+                    (column, pa.float64() if column in float_columns else pa.string()) for column in chunk.columns
+                ])
+                self.parquet_writer = pq.ParquetWriter(self.path, schema)
+            table = pa.Table.from_pandas(chunk, schema=self.parquet_writer.schema, preserve_index=False)
+            self.parquet_writer.write_table(table)
+        else:
+            chunk.to_csv(self.path, mode="w" if self.rows_written == 0 else "a", header=self.rows_written == 0, index=False)
+        self.rows_written += len(chunk)
+
+    def close(self):
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+
+# Stream the input in chunks so memory use stays bounded by the chunk size, whatever the size of the fleet
+def score_file(input_path, output_path, backend='random_forest', chunksize=DEFAULT_CHUNKSIZE, log_every=10):
+    """Score every row of a vehicle-level CSV and write it with its scores, returning (rows, seconds)."""
+    score_chunk, (low, high) = make_scorer(backend)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    writer = _ChunkWriter(output_path)
+
+    start = time.perf_counter()
+    try:
+        for chunk_number, chunk in enumerate(pd.read_csv(input_path, chunksize=chunksize, dtype=str), start=1):
+            missing = [col for col in required_columns if col not in chunk]
+            if missing:
+                raise ValueError(f"{input_path} is missing required columns: {missing}")
+
+            cleaned = clean_emissions_data(chunk)
+            # A blank powertrain share means none of that powertrain, like '-', rather than an unknown share
+            cleaned[powertrain_columns] = cleaned[powertrain_columns].fillna(0.0)
+            scores = score_chunk(cleaned)
+            cleaned['Sustainability Score'] = scores
+            cleaned['Sustainability Score (Normalized)'] = 100 * (scores - low) / (high - low)
+            writer.write(cleaned)
+
+            if chunk_number % log_every == 0:
+                elapsed = time.perf_counter() - start
+                print(f"Scored {writer.rows_written:,} rows ({writer.rows_written / elapsed:,.0f} rows/sec)")
+    finally:
+        writer.close()
+
+    return writer.rows_written, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a large vehicle-level CSV in bounded memory.")
+    parser.add_argument("input", help="CSV with the CO2, Ton-MPG and powertrain share columns of the EPA data.")
+    parser.add_argument("output", help="Output path; a .parquet suffix writes Parquet, anything else CSV.")
+    parser.add_argument("--backend", choices=["random_forest", "exact"], default="random_forest", help="Scoring backend.")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Rows read and scored at a time.")
+    args = parser.parse_args()
+
+    rows, seconds = score_file(args.input, args.output, args.backend, args.chunksize)
+    print(f"Scored {rows:,} rows in {seconds:.1f}s ({rows / seconds:,.0f} rows/sec) -> {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+import argparse
+import json
+import os
+import time
+import pandas as pd
+from functools import lru_cache
+from manufacturer_index import group_by_manufacturer
+
+# Compact chart data the pages draw interactive charts from, in the browser, instead of the pre-rendered PNGs
+CHART_DATA_PATH = "data/chart_data.json"
+
+# Decimal places kept in the payload; the charts never show more
+PAYLOAD_DECIMALS = 2
+
+# Store a table as its column names and row lists, which is far smaller than one JSON object per row
+def _table(frame, decimals=PAYLOAD_DECIMALS):
+    frame = frame.round(decimals).astype(object).where(frame.notna(), None)
+    return {'columns': list(frame.columns), 'data': frame.to_numpy().tolist()}
+
+# Every manufacturer's observed (smoothed) scores next to its forecast and interval
+def forecast_table(series, forecasts):
+    """Return one row per manufacturer and date with the observed score, the forecast and its interval."""
+    tables = []
+    for manufacturer, forecast in forecasts.items():
+        observed = series[manufacturer][['ds', 'y']]
+        table = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']].merge(observed, on='ds', how='outer')
+        tables.append(table.assign(Manufacturer=manufacturer))
+    table = pd.concat(tables, ignore_index=True).sort_values(['Manufacturer', 'ds'], kind='stable')
+    table['ds'] = table['ds'].dt.strftime('%Y-%m-%d')
+    return table.rename(columns={
+        'ds': 'Date', 'y': 'Observed', 'yhat': 'Forecast', 'yhat_lower': 'Lower', 'yhat_upper': 'Upper'
+    })[['Manufacturer', 'Date', 'Observed', 'Forecast', 'Lower', 'Upper']]
+
+# Mean CO2 and MPG of every manufacturer's vehicle types per model year, as in the CO2/MPG plots
+def co2_mpg_table():
+    """Return one row per manufacturer and model year with the mean Real-World CO2 and MPG."""
+    from visualizations import prepare_co2_mpg_data
+
+    return prepare_co2_mpg_data().groupby(['Manufacturer', 'Model Year'], as_index=False).agg(**{
+        'CO2': ('Real-World CO2 (g/mi)', 'mean'),
+        'MPG': ('Real-World MPG', 'mean'),
+    })
+
+# Each manufacturer's powertrain distribution for the pie charts' model year
+def powertrain_table():
+    """Return one row per manufacturer and powertrain with its share of the manufacturer's mix."""
+    from data_cleaning import powertrain_columns
+    from manufacturer_advanced_visuals import load_powertrain_data
+
+    totals = load_powertrain_data().groupby('Manufacturer')[powertrain_columns].sum()
+    shares = totals.div(totals.sum(axis=1), axis=0).reset_index().melt(
+        id_vars='Manufacturer', var_name='Powertrain', value_name='Share'
+    )
+    shares['Powertrain'] = shares['Powertrain'].str.replace('Powertrain - ', '', regex=False)
+    return shares[shares['Share'] > 0].sort_values(['Manufacturer', 'Powertrain'], kind='stable')
+
+# Gather every table the interactive charts need into one payload
+def build_chart_data(aggregated_scores=None):
+    """Return the chart payload: the yearly scores, forecasts, CO2/MPG means and powertrain shares."""
+    from random_forest_model import get_aggregated_scores
+    from forecast_store import load_forecast_table
+    from future_predictions import forecast_manufacturers, prepare_series, split_by_manufacturer
+    from manufacturer_advanced_visuals import load_aggregated_scores, powertrain_colors
+
+    aggregated_scores = get_aggregated_scores() if aggregated_scores is None else aggregated_scores
+    series = {manufacturer: prepare_series(data) for manufacturer, data in split_by_manufacturer(aggregated_scores).items()}
+
+    # Use the forecasts future_predictions saved to the forecast table; only manufacturers missing from it are forecast here
+    table = load_forecast_table()
+    forecasts = {} if table is None else {
+        manufacturer: forecast.drop(columns='Manufacturer')
+        for manufacturer, forecast in group_by_manufacturer(table, sort_by='ds').items() if manufacturer in series
+    }
+    missing = [manufacturer for manufacturer in series if manufacturer not in forecasts]
+    if missing:
+        _, computed, _ = forecast_manufacturers(aggregated_scores, missing)
+        forecasts.update(computed)
+    scores = load_aggregated_scores(aggregated_scores).rename(columns={'Yearly Sustainability Score': 'Score'})
+    return {
+        'scores': _table(scores[['Manufacturer', 'Model Year', 'Score']].sort_values(['Manufacturer', 'Model Year'])),
+        'forecasts': _table(forecast_table(series, forecasts)),
+        'co2_mpg': _table(co2_mpg_table()),
+        'powertrain': _table(powertrain_table(), decimals=4),
+        'powertrain_colors': {col.replace('Powertrain - ', ''): color for col, color in powertrain_colors.items()},
+    }
+
+def save_chart_data(payload, path=CHART_DATA_PATH):
+    """Atomically write the chart payload as compact JSON and return its size in bytes."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, separators=(',', ':'))
+    os.replace(tmp_path, path)
+    return os.path.getsize(path)
+
+# Column each table's per-manufacturer rows are ordered by
+table_order = {'scores': 'Model Year', 'forecasts': 'Date', 'co2_mpg': 'Model Year', 'powertrain': 'Powertrain'}
+
+# Parse the payload and group its tables by manufacturer once per version of the file, not on every page rerun
+@lru_cache(maxsize=1)
+def _load_chart_data(path, modified_time):
+    with open(path) as f:
+        payload = json.load(f)
+    chart_data = {
+        name: pd.DataFrame(value['data'], columns=value['columns']) if 'columns' in value else value
+        for name, value in payload.items()
+    }
+    chart_data['by_manufacturer'] = {
+        name: group_by_manufacturer(chart_data[name], sort_by) for name, sort_by in table_order.items()
+    }
+    return chart_data
+
+def load_chart_data(path=CHART_DATA_PATH):
+    """Return the chart payload with its tables as DataFrames, or None when it has not been built.
+
+    'by_manufacturer' maps each table to its rows per manufacturer. The tables are shared between page reruns, so
+    treat them as read-only.
+    """
+    if not os.path.exists(path):
+        return None
+    return _load_chart_data(path, os.path.getmtime(path))
+
+# Vega-Lite specs of the interactive charts. Dragging zooms and pans the year axis and clicking a legend entry
+# highlights a manufacturer; both happen in the browser, without rerunning the page.
+_zoom = {'name': 'zoom', 'select': {'type': 'interval', 'encodings': ['x']}, 'bind': 'scales'}
+_year_axis = {'field': 'Model Year', 'type': 'quantitative', 'title': 'Year', 'axis': {'format': 'd'}}
+_year_tooltip = {'field': 'Model Year', 'type': 'quantitative', 'title': 'Year', 'format': 'd'}
+
+def forecast_spec():
+    """Return the spec of a manufacturer's observed scores, forecast and confidence interval."""
+    date = {'field': 'Date', 'type': 'temporal', 'title': 'Year', 'axis': {'format': '%Y'}}
+    return {
+        'encoding': {'x': date},
+        'layer': [
+            {'mark': {'type': 'area', 'color': 'blue', 'opacity': 0.3},
+             'encoding': {'y': {'field': 'Lower', 'type': 'quantitative', 'title': 'Sustainability Score'}, 'y2': {'field': 'Upper'}}},
+            {'mark': {'type': 'line', 'color': 'cyan', 'strokeWidth': 2},
+             'encoding': {'y': {'field': 'Forecast', 'type': 'quantitative'}}},
+            {'mark': {'type': 'point', 'color': 'white', 'filled': True}, 'params': [_zoom],
+             'encoding': {
+                 'y': {'field': 'Observed', 'type': 'quantitative'},
+                 'tooltip': [{'field': 'Date', 'type': 'temporal', 'title': 'Year', 'timeUnit': 'year'}] + [
+                     {'field': field, 'type': 'quantitative', 'format': '.2f'} for field in ['Observed', 'Forecast', 'Lower', 'Upper']
+                 ],
+             }},
+        ],
+    }
+
+def yearly_line_spec(field, title, color):
+    """Return the spec of a line over the model years of one column of the CO2/MPG table."""
+    return {
+        'mark': {'type': 'line', 'point': True, 'color': color, 'strokeWidth': 2},
+        'params': [_zoom],
+        'encoding': {
+            'x': _year_axis,
+            'y': {'field': field, 'type': 'quantitative', 'title': title, 'scale': {'zero': False}},
+            'tooltip': [_year_tooltip, {'field': field, 'type': 'quantitative', 'format': '.2f', 'title': title}],
+        },
+    }
+
+# The rate charts show the year-over-year change of the yearly score, computed in the browser like pct_change
+def rate_spec(title, color):
+    """Return the spec of the year-over-year percentage change of a manufacturer's yearly score."""
+    return {
+        'transform': [
+            {'window': [{'op': 'lag', 'field': 'Score', 'as': 'Previous'}], 'sort': [{'field': 'Model Year'}]},
+            {'filter': 'datum.Previous != null'},
+            {'calculate': '100 * (datum.Score / datum.Previous - 1)', 'as': 'Rate'},
+        ],
+        'mark': {'type': 'bar', 'color': color, 'stroke': 'white'},
+        'params': [_zoom],
+        'encoding': {
+            'x': _year_axis,
+            'y': {'field': 'Rate', 'type': 'quantitative', 'title': title},
+            'tooltip': [_year_tooltip, {'field': 'Rate', 'type': 'quantitative', 'format': '.2f', 'title': title}],
+        },
+    }
+
+def powertrain_spec(powertrain_colors):
+    """Return the spec of a manufacturer's powertrain distribution pie chart."""
+    return {
+        'mark': {'type': 'arc'},
+        'encoding': {
+            'theta': {'field': 'Share', 'type': 'quantitative', 'stack': True},
+            'color': {'field': 'Powertrain', 'type': 'nominal', 'legend': {'orient': 'left'}, 'scale': {
+                'domain': list(powertrain_colors), 'range': list(powertrain_colors.values()),
+            }},
+            'tooltip': [{'field': 'Powertrain', 'type': 'nominal'}, {'field': 'Share', 'type': 'quantitative', 'format': '.1%'}],
+        },
+    }
+
+def sustainability_growth_spec():
+    """Return the spec comparing every manufacturer's yearly score, highlighting the ones picked in the legend."""
+    picked = {'name': 'picked', 'select': {'type': 'point', 'fields': ['Manufacturer']}, 'bind': 'legend'}
+    return {
+        'mark': {'type': 'line', 'point': True},
+        'params': [picked, _zoom],
+        'encoding': {
+            'x': _year_axis,
+            'y': {'field': 'Score', 'type': 'quantitative', 'title': 'Sustainability Score'},
+            'color': {'field': 'Manufacturer', 'type': 'nominal', 'scale': {'scheme': 'tableau20'}},
+            'opacity': {'condition': {'param': 'picked', 'value': 1}, 'value': 0.15},
+            'tooltip': [{'field': 'Manufacturer', 'type': 'nominal'}, _year_tooltip, {'field': 'Score', 'type': 'quantitative', 'format': '.2f'}],
+        },
+    }
+
+def comparative_boxplot_spec():
+    """Return the spec of the boxplot comparing the distribution of yearly scores per manufacturer."""
+    return {
+        'mark': {'type': 'boxplot', 'color': '#6B8E23', 'median': {'color': 'white'}},
+        'encoding': {
+            'x': {'field': 'Manufacturer', 'type': 'nominal', 'axis': {'labelAngle': -45}},
+            'y': {'field': 'Score', 'type': 'quantitative', 'title': 'Yearly Sustainability Score'},
+        },
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the compact data the pages' interactive charts are drawn from.")
+    parser.add_argument("--output", default=CHART_DATA_PATH, help="JSON file the chart data is written to.")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    payload = build_chart_data()
+    size = save_chart_data(payload, args.output)
+    for name, value in payload.items():
+        rows = f"{len(value['data'])} rows, " if 'data' in value else ""
+        print(f"{name}: {rows}{len(json.dumps(value, separators=(',', ':'))) / 1024:.1f} KB")
+    print(f"Saved {size / 1024:.1f} KB of chart data to {args.output} in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import time
+from functools import lru_cache
+import matplotlib
+import pandas as pd
+from joblib import Parallel, delayed
+from data_processing import CACHE_DIR, file_hash
+from image_assets import missing_variants, write_image_variants
+
+# Worker processes the charts are rendered on; -1 uses every core
+N_JOBS = -1
+
+# Directory of the chart manifests, which hold the fingerprint of the inputs each chart was last rendered from.
+# Every plot directory has its own manifest, so stages rendering different directories never write the same file.
+MANIFEST_DIR = CACHE_DIR
+
+# One chart to render: its type and manufacturer (None for the all-manufacturer charts) for reporting, the file it
+# writes, and the plot function with the input data it is called with
+def chart_job(chart_type, manufacturer, path, plot_function, *args):
+    """Return a chart job for `render_charts`."""
+    return {'chart': chart_type, 'manufacturer': manufacturer, 'path': path, 'function': plot_function, 'args': args}
+
+def _update_digest(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        columns = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        digest.update(json.dumps([str(col) for col in columns]).encode("utf-8"))
+    else:
+        digest.update(json.dumps(value, default=str).encode("utf-8"))
+
+# The code a plot function draws with: its module, which holds module-level styling such as the powertrain colors,
+# and every src module that module imports, which holds the helpers it calls
+@lru_cache(maxsize=None)
+def _code_fingerprint(source_file):
+    from build_pipeline import SRC_DIR, source_closure
+
+    if os.path.dirname(os.path.abspath(source_file)) != SRC_DIR:
+        return {source_file: file_hash(source_file)}
+    module = os.path.splitext(os.path.basename(source_file))[0]
+    return {name: file_hash(os.path.join(SRC_DIR, f"{name}.py")) for name in source_closure(module)}
+
+# A chart's fingerprint covers its input data slice and its styling: the code of the plot function's module and the
+# src modules it imports, and the matplotlib version that decides how they are drawn
+def job_fingerprint(job):
+    """Return a hash of everything that determines the chart a job renders."""
+    digest = hashlib.sha256()
+    code = _code_fingerprint(inspect.getsourcefile(job['function']))
+    _update_digest(digest, [job['path'], matplotlib.__version__, code])
+    for arg in job['args']:
+        _update_digest(digest, arg)
+    return digest.hexdigest()
+
+def manifest_path(plots_dir, manifest_dir=MANIFEST_DIR):
+    """Return the path of the manifest of one plot directory."""
+    return os.path.join(manifest_dir, f"chart_manifest_{os.path.basename(os.path.normpath(plots_dir))}.json")
+
+def load_manifest(manifest_path):
+    """Return a chart manifest, mapping output paths to input fingerprints."""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path) as f:
+        return json.load(f)
+
+def save_manifest(manifest, manifest_path):
+    """Atomically save the chart manifest."""
+    os.makedirs(os.path.dirname(manifest_path), exist_ok=True)
+    tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+# Draw one chart inside a worker on the non-interactive Agg backend, then write its display-size variants,
+# timing both and capturing any failure
+def _render_chart(job):
+    matplotlib.use("Agg", force=True)
+    start = time.perf_counter()
+    try:
+        job['function'](*job['args'])
+        write_image_variants(job['path'])
+        error = None
+    except Exception as exc:
+        error = f"{type(exc).__name__}: {exc}"
+    return job['chart'], job['manufacturer'], job['path'], time.perf_counter() - start, error
+
+def render_charts(jobs, n_jobs=N_JOBS, force=False, manifest_dir=MANIFEST_DIR):
+    """Render the chart jobs whose inputs changed on a process pool and return a per-chart report.
+
+    A chart is skipped when it and its display-size variants exist and the manifest holds the same fingerprint; `force`
+    renders every chart. The report has each chart's timing, whether it was skipped and any error.
+    """
+    directories = {os.path.dirname(job['path']) for job in jobs}
+    manifests = {directory: load_manifest(manifest_path(directory, manifest_dir)) for directory in directories}
+    fingerprints = [job_fingerprint(job) for job in jobs]
+    stale = [
+        (job, fingerprint) for job, fingerprint in zip(jobs, fingerprints)
+        if force or manifests[os.path.dirname(job['path'])].get(job['path']) != fingerprint
+        or not os.path.exists(job['path']) or missing_variants(job['path'])
+    ]
+
+    for directory in {os.path.dirname(job['path']) for job, _ in stale}:
+        os.makedirs(directory, exist_ok=True)
+    results = Parallel(n_jobs=n_jobs)(delayed(_render_chart)(job) for job, _ in stale)
+
+    for (job, fingerprint), (_, _, _, _, error) in zip(stale, results):
+        manifest = manifests[os.path.dirname(job['path'])]
+        if error is None:
+            manifest[job['path']] = fingerprint
+        else:
+            manifest.pop(job['path'], None)
+    for directory in {os.path.dirname(job['path']) for job, _ in stale}:
+        save_manifest(manifests[directory], manifest_path(directory, manifest_dir))
+
+    rendered = {job['path'] for job, _ in stale}
+    skipped = [(job['chart'], job['manufacturer'], job['path'], 0.0, None) for job in jobs if job['path'] not in rendered]
+    report = pd.DataFrame(results + skipped, columns=['Chart', 'Manufacturer', 'Path', 'Seconds', 'Error'])
+    report['Skipped'] = report['Path'].isin([path for _, _, path, _, _ in skipped])
+    return report
+
+def print_render_report(report, wall_seconds):
+    """Print the render time per chart type, the total against the wall time, the skipped charts and any failure."""
+    if report.empty:
+        print("No charts to render.")
+        return
+    rendered = report[~report['Skipped']]
+    if not rendered.empty:
+        by_chart = rendered.groupby('Chart')['Seconds'].agg(['count', 'sum', 'mean']).rename(
+            columns={'count': 'Charts', 'sum': 'Total Seconds', 'mean': 'Mean Seconds'}
+        )
+        print(by_chart.to_string())
+    print(
+        f"Rendered {len(rendered)} charts in {wall_seconds:.1f}s wall time ({rendered['Seconds'].sum():.1f}s of rendering); "
+        f"skipped {report['Skipped'].sum()} unchanged charts"
+    )
+    for _, failed in report[report['Error'].notna()].iterrows():
+        print(f"Failed to render {failed['Path']}: {failed['Error']}")
+
+# Every chart of the dashboard, from the CO2/MPG plots, the advanced visuals and the forecasts
+def all_chart_jobs(manufacturers=None):
+    """Return the chart jobs of every plotting module, limited to `manufacturers` when given."""
+    import visualizations
+    import manufacturer_advanced_visuals
+    import future_predictions
+    from random_forest_model import get_aggregated_scores
+
+    aggregated_scores = get_aggregated_scores()
+    series, forecasts, _ = future_predictions.forecast_manufacturers(aggregated_scores, manufacturers)
+    return (
+        visualizations.chart_jobs(manufacturers) +
+        manufacturer_advanced_visuals.chart_jobs(manufacturers, aggregated_scores) +
+        future_predictions.chart_jobs(series, forecasts)
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Render every dashboard chart on a process pool.")
+    parser.add_argument("--manufacturers", nargs="+", help="Only render these manufacturers' charts.")
+    parser.add_argument("--n-jobs", type=int, default=N_JOBS, help="Worker processes; -1 uses every core.")
+    parser.add_argument("--force", action="store_true", help="Re-render every chart, even when its inputs are unchanged.")
+    args = parser.parse_args()
+
+    jobs = all_chart_jobs(args.manufacturers)
+    start = time.perf_counter()
+    report = render_charts(jobs, args.n_jobs, args.force)
+    print_render_report(report, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
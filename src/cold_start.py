@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+
+# Modules too heavy to load while rendering a page; they may only be imported once a model is actually used
+HEAVY_MODULES = ("torch", "transformers", "prophet")
+
+# Cold-start budget, in seconds, for the pages and the src modules they import directly
+COLD_START_BUDGETS = {
+    "🗂️_Home_Page.py": 3.0,
+    "pages/1_📈_Manufacturer_Analysis.py": 4.0,
+    "data_processing": 1.5,
+    "random_forest_model": 3.0,
+    "ai_sentiment_analysis": 1.5,
+}
+
+# Repository root, which the pages and data paths are relative to
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Script run in a fresh interpreter so nothing is already imported when the timer starts
+_PROBE = """
+import importlib, json, runpy, sys, time
+target, heavy_modules = sys.argv[1], json.loads(sys.argv[2])
+start = time.perf_counter()
+if target.endswith(".py"):
+    runpy.run_path(target, run_name="__main__")
+else:
+    importlib.import_module(target)
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "heavy_modules": [m for m in heavy_modules if m in sys.modules]}))
+"""
+
+def measure_cold_start(target):
+    """Import a src module (or run a page script) in a fresh interpreter and return its time and the heavy modules it loaded."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.join(REPO_ROOT, "src"), env.get("PYTHONPATH")]))
+    completed = subprocess.run(
+        [sys.executable, "-c", _PROBE, target, json.dumps(HEAVY_MODULES)],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["target"] = target
+    return result
+
+def check_cold_start(target, budget_seconds=None):
+    """Assert that a target loads within its budget without importing any heavy module, and return the measurement."""
+    budget_seconds = COLD_START_BUDGETS[target] if budget_seconds is None else budget_seconds
+    result = measure_cold_start(target)
+    assert not result["heavy_modules"], f"{target} imported {', '.join(result['heavy_modules'])} at startup"
+    assert result["seconds"] <= budget_seconds, f"{target} took {result['seconds']:.2f}s, over its {budget_seconds:.2f}s budget"
+    return result
+
+if __name__ == "__main__":
+    failures = 0
+    for target, budget_seconds in COLD_START_BUDGETS.items():
+        try:
+            result = check_cold_start(target, budget_seconds)
+            print(f"OK    {target}: {result['seconds']:.2f}s (budget {budget_seconds:.2f}s)")
+        except AssertionError as e:
+            failures += 1
+            print(f"FAIL  {e}")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+# Bump this whenever the cleaning logic changes so cached cleaned data is rebuilt
+CLEANING_VERSION = 1
+
+# Measurement columns, where '-' marks a value the EPA did not report
+measurement_columns = [
+    'Production (000)', 'Real-World MPG', 'Real-World CO2 (g/mi)',
+    'Ton-MPG (Real-World)', 'Weight (lbs)'
+]
+
+# Powertrain share columns, where '-' means the manufacturer sold none of that powertrain
+powertrain_columns = [
+    'Powertrain - Diesel',
+    'Powertrain - Battery Electric Vehicle (BEV)',
+    'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)',
+    'Powertrain - Fuel Cell Electric Vehicle (FCEV)',
+    'Powertrain - Other (incl. CNG)',
+    'Powertrain - Gasoline Mild Hybrid/MHEV',
+    'Powertrain - Gasoline Strong Hybrid/HEV',
+    'Powertrain - Gasoline with Start/Stop',
+    'Powertrain - Gasoline without Start/Stop'
+]
+
+# Parse a column mixing plain numbers, percentages ('35.20%') and '-' placeholders using vectorized string ops
+def parse_epa_numeric(column, missing=np.nan):
+    """Convert a mixed-format EPA column to floats, turning percentages into fractions and '-' into `missing`."""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.astype(float)
+
+    text = column.astype(str).str.strip()
+    is_percent = text.str.endswith('%', na=False)
+    values = pd.to_numeric(text.str.rstrip('%'), errors='coerce')
+    values = values.where(~is_percent, values / 100)
+    return values.mask(text == '-', missing).astype(float)
+
+# Clean every mixed-format column of the filtered EPA data in one pass
+def clean_emissions_data(frame):
+    """Return a copy of the EPA data with whichever measurement and powertrain columns it has as floats."""
+    cleaned = frame.copy()
+    for column in measurement_columns:
+        if column in cleaned:
+            cleaned[column] = parse_epa_numeric(cleaned[column])
+    for column in powertrain_columns:
+        if column in cleaned:
+            cleaned[column] = parse_epa_numeric(cleaned[column], missing=0.0)
+    return cleaned
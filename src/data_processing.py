@@ -1,21 +1,19 @@
+import hashlib
+import os
+from functools import lru_cache
 import pandas as pd
+import pyarrow as pa
+from data_cleaning import CLEANING_VERSION, clean_emissions_data
 
-# Read the file 
-emissions_data = pd.read_csv("data/emissions_data.csv")
-
-# As many manufacturers in the data set don't have valid entries before 2008, to maintain consistency, we will only work with the data from 2008 onwards
-emissions_data['Model Year'] = emissions_data['Model Year'].replace('Prelim. 2024', '2024')
-emissions_data['Model Year'] = pd.to_numeric(emissions_data['Model Year'])
-data_2008 = emissions_data[emissions_data['Model Year'] >= 2008]
-
-# Separating the data for all the manufacturers combined, and the separate unique manufacturers
-specific_manufacturers_data = data_2008[data_2008['Manufacturer'] != 'All']
+# Source EPA data and the directory holding its cached columnar copy
+EMISSIONS_CSV = "data/emissions_data.csv"
+CACHE_DIR = "data/cache"
 
 # Filtering the relevant columns for our analysis
 relevant_columns = [
-    'Manufacturer', 'Model Year', 'Vehicle Type', 'Production (000)', 
+    'Manufacturer', 'Model Year', 'Vehicle Type', 'Production (000)',
     'Real-World MPG', 'Real-World CO2 (g/mi)', 'Ton-MPG (Real-World)', 'Weight (lbs)',
-    'Powertrain - Diesel', 
+    'Powertrain - Diesel',
     'Powertrain - Battery Electric Vehicle (BEV)',
     'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)',
     'Powertrain - Fuel Cell Electric Vehicle (FCEV)',
@@ -26,10 +24,76 @@ relevant_columns = [
     'Powertrain - Gasoline without Start/Stop'
 ]
 
-# Filter the dataset for specific manufacturers (excluding "All") and relevant columns
-specific_manufacturers_filtered = specific_manufacturers_data[relevant_columns].copy()
+# Hash the contents of a file so cached artifacts can be tied to the exact data they were built from
+def file_hash(path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+# Identify one version of the cleaned dataset: the CSV contents plus the cleaning logic applied to them
+def dataset_version(csv_path=EMISSIONS_CSV):
+    """Return the version tag of the cleaned data built from `csv_path`."""
+    return f"{file_hash(csv_path)[:16]}_v{CLEANING_VERSION}"
+
+# Parse the raw CSV and filter it down to the manufacturer level data we analyze
+def build_specific_manufacturers_filtered(csv_path=EMISSIONS_CSV):
+    """Read the EPA CSV and return the 2008+ per-manufacturer rows for the relevant columns."""
+    emissions_data = pd.read_csv(csv_path)
+
+    # As many manufacturers in the data set don't have valid entries before 2008, to maintain consistency, we will only work with the data from 2008 onwards
+    emissions_data['Model Year'] = emissions_data['Model Year'].replace('Prelim. 2024', '2024')
+    emissions_data['Model Year'] = pd.to_numeric(emissions_data['Model Year'])
+    data_2008 = emissions_data[emissions_data['Model Year'] >= 2008]
+
+    # Separating the data for all the manufacturers combined, and the separate unique manufacturers
+    specific_manufacturers_data = data_2008[data_2008['Manufacturer'] != 'All']
+
+    # Filter the dataset for specific manufacturers (excluding "All") and relevant columns
+    return specific_manufacturers_data[relevant_columns].copy()
+
+# Load the filtered and cleaned data from an uncompressed Arrow IPC file keyed by the CSV's content hash, rebuilding it only when the CSV or the cleaning logic changes
+def load_specific_manufacturers_filtered(csv_path=EMISSIONS_CSV, cache_dir=CACHE_DIR):
+    """Return the filtered, typed EPA data, served from the memory-mapped Arrow cache when it is current."""
+    cache_path = os.path.join(cache_dir, f"emissions_{dataset_version(csv_path)}.arrow")
+
+    if os.path.exists(cache_path):
+        with pa.memory_map(cache_path, "r") as source:
+            return pa.ipc.open_file(source).read_all().to_pandas()
+
+    filtered = clean_emissions_data(build_specific_manufacturers_filtered(csv_path))
+
+    # Write to a temporary file first so a concurrent reader never sees a partial cache
+    os.makedirs(cache_dir, exist_ok=True)
+    table = pa.Table.from_pandas(filtered)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, cache_path)
+
+    # Drop caches built from older versions of the CSV or the cleaning logic
+    for name in os.listdir(cache_dir):
+        stale_path = os.path.join(cache_dir, name)
+        if name.startswith("emissions_") and name.endswith(".arrow") and stale_path != cache_path:
+            os.remove(stale_path)
+
+    return filtered
+
+# Memoize the loaded data so every consumer in the same process shares a single load
+@lru_cache(maxsize=None)
+def _cached_specific_manufacturers_filtered():
+    return load_specific_manufacturers_filtered()
+
+def get_specific_manufacturers_filtered():
+    """Return a copy of the filtered EPA data, loading it on first use."""
+    return _cached_specific_manufacturers_filtered().copy()
+
+if __name__ == "__main__":
+    specific_manufacturers_filtered = get_specific_manufacturers_filtered()
 
-if specific_manufacturers_filtered.empty:
-    print("No data available for plotting.")
-else:
-    print("Successfully filtered the data.")
\ No newline at end of file
+    if specific_manufacturers_filtered.empty:
+        print("No data available for plotting.")
+    else:
+        print("Successfully filtered the data.")
@@ -0,0 +1,75 @@
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+
+# Directory of the cached documents: one JSON file per document, in a subdirectory per kind ('pdf', 'pdf_page',
+# 'pdf_legacy', 'reddit', 'sentiment')
+DOCUMENT_STORE_DIR = "document_cache"
+
+# Address a document by its kind and key (a content hash, a manufacturer name), so a lookup is a single file read
+def document_path(kind, key, store_dir=DOCUMENT_STORE_DIR):
+    """Return the file path of the cached document with the given kind and key."""
+    return os.path.join(store_dir, kind, f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.json")
+
+# Load a cached document, treating unreadable files and documents cached by another version of the logic as a miss
+def load_document(kind, key, version, store_dir=DOCUMENT_STORE_DIR):
+    """Return the cached document for `key`, or None when it is missing or was cached with a different version."""
+    path = document_path(kind, key, store_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            document = json.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable document {path}: {e}")
+        return None
+    if document.get('key') != key or document.get('version') != version:
+        return None
+    return document
+
+# Save one document atomically; no other document's file is read or written
+def save_document(kind, key, version, content, store_dir=DOCUMENT_STORE_DIR, **metadata):
+    """Store the document under `key` with its metadata and return its path."""
+    path = document_path(kind, key, store_dir)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    document = {'key': key, 'version': version, 'cached_at': datetime.now().isoformat(), **metadata, 'content': content}
+
+    # Write to a temporary file first so a concurrent reader never sees a partial document
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(document, f)
+    os.replace(tmp_path, path)
+    return path
+
+# Move the entries of a monolithic JSON cache ({key: content}) into the store. The old PDF cache held each report's
+# relevant paragraphs under its path, not the page content hashes the 'pdf' documents are keyed by, so it moves to
+# the 'pdf_legacy' kind, which keeps the text of reports whose PDF is no longer available. It also kept one global
+# 'num_pages', overwritten by each report, so page counts are re-read from the PDFs that are still available.
+def migrate_json_cache(cache_file, kind, version, store_dir=DOCUMENT_STORE_DIR):
+    """Store every document of a single-file JSON cache and return the number migrated."""
+    with open(cache_file) as f:
+        cache = json.load(f)
+    cache.pop('num_pages', None)
+
+    for key, content in cache.items():
+        metadata = {}
+        if kind == 'pdf_legacy':
+            metadata['num_pages'] = None
+            if os.path.exists(key):
+                import pdfplumber
+                with pdfplumber.open(key) as pdf:
+                    metadata['num_pages'] = len(pdf.pages)
+        save_document(kind, key, version, content, store_dir, **metadata)
+    return len(cache)
+
+if __name__ == "__main__":
+    from ai_sentiment_analysis import CACHE_VERSION
+
+    parser = argparse.ArgumentParser(description="Move a single-file JSON cache into the per-document store.")
+    parser.add_argument("cache_file", help="JSON cache to migrate, e.g. reddit_cache.json or pdf_cache.json.")
+    parser.add_argument("--kind", choices=["reddit", "pdf_legacy"], default="reddit", help="Kind of the cached documents.")
+    args = parser.parse_args()
+    migrated = migrate_json_cache(args.cache_file, args.kind, CACHE_VERSION)
+    print(f"Migrated {migrated} documents from {args.cache_file} to {os.path.join(DOCUMENT_STORE_DIR, args.kind)}")
@@ -0,0 +1,145 @@
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from data_processing import CACHE_DIR
+from forecast_store import forecast_key, load_forecast, save_forecast
+from future_predictions import FORECAST_HORIZON, N_JOBS, forecast_settings, forecasters, prepare_series, split_by_manufacturer
+from random_forest_model import get_aggregated_scores
+
+# Fold results kept between runs, one file per fold under the forecast store's mtime-LRU disk budget, and where the
+# summary table is written
+FOLD_DIR = os.path.join(CACHE_DIR, "forecast_backtest_folds")
+MAX_FOLD_STORE_BYTES = 5 * 1024 * 1024
+RESULTS_PATH = "data/forecast_backtest_results.csv"
+
+# Every fold trains on at least this many years and is scored on the next `horizon` years
+INITIAL_YEARS = 8
+HORIZON = 3
+
+# Build the rolling-origin folds of every manufacturer: expanding training windows, each followed by its test years
+def rolling_origin_folds(aggregated_scores, initial=INITIAL_YEARS, horizon=HORIZON):
+    """Return a dict mapping (manufacturer, cutoff year) to the (train, test) ds/y series of that fold."""
+    folds = {}
+    for manufacturer, data in split_by_manufacturer(aggregated_scores).items():
+        series = prepare_series(data)
+        for cutoff in range(initial, len(series)):
+            folds[(manufacturer, series['ds'].iloc[cutoff - 1].year)] = (
+                series.iloc[:cutoff].reset_index(drop=True),
+                series.iloc[cutoff:cutoff + horizon].reset_index(drop=True),
+            )
+    return folds
+
+# A fold's result only depends on its training series, its test values and the backend settings
+def fold_key(train, test, settings):
+    """Return the cache key of one fold."""
+    return forecast_key(train, {'settings': settings, 'actual': test['y'].tolist()})
+
+# Forecast the given folds with one backend, keeping the per-step results of every fold that did not fail
+def _run_forecaster(forecaster, folds, missing, n_jobs):
+    """Return a dict mapping each fold in `missing` to its per-step results."""
+    fold_results = {}
+    # The backends take a dict of named series, so every fold is one entry: Prophet spreads the folds over the
+    # process pool, and the damped-trend backend forecasts all folds with the same cutoff in one batch
+    for fold, forecast, seconds, error in forecasters[forecaster](missing, n_jobs):
+        if error is not None:
+            print(f"{forecaster} fold {fold} failed: {error}")
+            continue
+        train, test = folds[fold]
+        fold_results[fold] = pd.DataFrame({
+            'Step': np.arange(1, len(test) + 1),
+            'Actual': test['y'].to_numpy(),
+            'Forecast': forecast['yhat'].to_numpy()[len(train):len(train) + len(test)],
+            'Fit Seconds': seconds,
+        })
+    return fold_results
+
+# Forecast every fold with every backend, computing only the folds missing from the fold store
+def backtest(forecaster_names=None, initial=INITIAL_YEARS, horizon=HORIZON, n_jobs=N_JOBS, use_cache=True):
+    """Return the per-step results of every (manufacturer, backend, cutoff) fold and the number of cached folds."""
+    folds = rolling_origin_folds(get_aggregated_scores(), initial, horizon)
+    forecaster_names = forecaster_names or list(forecasters)
+
+    keys, fold_results, missing = {}, {}, {}
+    for forecaster in forecaster_names:
+        settings = forecast_settings(forecaster)
+        keys[forecaster] = {fold: fold_key(train, test, settings) for fold, (train, test) in folds.items()}
+        fold_results[forecaster], missing[forecaster] = {}, {}
+        for fold, (train, _) in folds.items():
+            stored = load_forecast(keys[forecaster][fold], FOLD_DIR) if use_cache else None
+            if stored is not None:
+                fold_results[forecaster][fold] = stored
+            else:
+                missing[forecaster][fold] = train
+    cached_folds = sum(len(results) for results in fold_results.values())
+
+    # Backtest the backends concurrently: the Prophet folds keep their own process pool while the damped-trend
+    # batches run alongside them
+    with ThreadPoolExecutor(max_workers=len(forecaster_names)) as executor:
+        futures = {
+            forecaster: executor.submit(_run_forecaster, forecaster, folds, missing[forecaster], n_jobs)
+            for forecaster in forecaster_names if missing[forecaster]
+        }
+    # Store the new folds once every backend is done, so evictions never race a backend that is still saving
+    for forecaster, future in futures.items():
+        for fold, result in future.result().items():
+            if use_cache:
+                save_forecast(keys[forecaster][fold], result, FOLD_DIR, MAX_FOLD_STORE_BYTES)
+            fold_results[forecaster][fold] = result
+
+    results = [
+        fold_results[forecaster][fold].assign(**{
+            'Fold Key': keys[forecaster][fold], 'Manufacturer': fold[0], 'Forecaster': forecaster, 'Cutoff Year': fold[1]
+        })
+        for forecaster in forecaster_names for fold in folds if fold in fold_results[forecaster]
+    ]
+    columns = ['Fold Key', 'Manufacturer', 'Forecaster', 'Cutoff Year', 'Step', 'Actual', 'Forecast', 'Fit Seconds']
+    return pd.concat(results, ignore_index=True)[columns], cached_folds
+
+# RMSE, MAPE and runtime of every fold group
+def summarize(fold_results, by):
+    """Return the backtest metrics aggregated over the fold results grouped by `by`."""
+    errors = fold_results.assign(**{
+        'Squared Error': (fold_results['Actual'] - fold_results['Forecast']) ** 2,
+        'Percentage Error': 100 * ((fold_results['Actual'] - fold_results['Forecast']) / fold_results['Actual']).abs(),
+    })
+    # Fit time is recorded once per fold, on each of its steps
+    per_fold = errors.drop_duplicates('Fold Key')
+    summary = errors.groupby(by).agg(**{
+        'Folds': ('Fold Key', 'nunique'),
+        'RMSE': ('Squared Error', lambda values: np.sqrt(values.mean())),
+        'MAPE (%)': ('Percentage Error', lambda values: values[np.isfinite(values)].mean()),
+    })
+    summary['Mean Fit Seconds'] = per_fold.groupby(by)['Fit Seconds'].mean()
+    return summary.reset_index()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rolling-origin backtest of every forecasting backend for every manufacturer.")
+    parser.add_argument("--forecasters", nargs="+", choices=list(forecasters), default=list(forecasters), help="Backends to evaluate.")
+    parser.add_argument("--initial", type=int, default=INITIAL_YEARS, help="Years in the smallest training window.")
+    parser.add_argument("--horizon", type=int, default=HORIZON, help=f"Years ahead each fold is scored on, at most {FORECAST_HORIZON}.")
+    parser.add_argument("--n-jobs", type=int, default=N_JOBS, help="Worker processes for the Prophet fits; -1 uses every core.")
+    parser.add_argument("--no-cache", action="store_true", help="Recompute every fold instead of reusing cached fold results.")
+    parser.add_argument("--output", default=RESULTS_PATH, help="CSV file the per-manufacturer results are written to.")
+    args = parser.parse_args()
+    # Every backend forecasts FORECAST_HORIZON years past the training window, so folds can't be scored further ahead
+    if not 1 <= args.horizon <= FORECAST_HORIZON:
+        parser.error(f"--horizon must be between 1 and {FORECAST_HORIZON}, got {args.horizon}")
+
+    start = time.perf_counter()
+    fold_results, cached_folds = backtest(args.forecasters, args.initial, args.horizon, args.n_jobs, not args.no_cache)
+    wall_seconds = time.perf_counter() - start
+
+    results = summarize(fold_results, ['Forecaster', 'Manufacturer'])
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    results.to_csv(args.output, index=False)
+
+    print(results.to_string(index=False))
+    print(summarize(fold_results, ['Forecaster']).to_string(index=False))
+    total_folds = fold_results['Fold Key'].nunique()
+    print(f"Backtested {total_folds} folds in {wall_seconds:.1f}s ({cached_folds} from the fold cache); results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import pandas as pd
+import pyarrow as pa
+from data_processing import CACHE_DIR
+
+# Directory of the content-addressed forecasts, the table the chart data is built from, and the disk budget of the store
+FORECAST_DIR = os.path.join(CACHE_DIR, "forecasts")
+FORECAST_TABLE = os.path.join(CACHE_DIR, "forecasts_table.arrow")
+MAX_STORE_BYTES = 20 * 1024 * 1024
+
+# Address a forecast by the exact series it was fitted on and every setting that shapes it
+def forecast_key(series, settings):
+    """Return a hash identifying the forecast of the ds/y `series` produced with `settings`."""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(series[['ds', 'y']], index=False).to_numpy().tobytes())
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()[:32]
+
+def forecast_path(key, store_dir=FORECAST_DIR):
+    """Return the file path of the forecast with the given key."""
+    return os.path.join(store_dir, f"{key}.arrow")
+
+def _read_arrow(path):
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all().to_pandas()
+
+def _write_arrow(frame, path):
+    # Write to a temporary file first so a concurrent reader never sees a partial file
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    os.replace(tmp_path, path)
+
+# Load a stored forecast, treating unreadable files as a miss and marking hits as recently used
+def load_forecast(key, store_dir=FORECAST_DIR):
+    """Return the stored forecast for `key`, or None when it has not been computed yet."""
+    path = forecast_path(key, store_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        forecast = _read_arrow(path)
+    except Exception as e:
+        print(f"Ignoring unreadable forecast {path}: {e}")
+        return None
+    os.utime(path)
+    return forecast
+
+# Save a forecast atomically, then evict the least recently used forecasts beyond the store's disk budget
+def save_forecast(key, forecast, store_dir=FORECAST_DIR, max_bytes=MAX_STORE_BYTES):
+    """Store the forecast under `key` and return its path."""
+    os.makedirs(store_dir, exist_ok=True)
+    path = forecast_path(key, store_dir)
+    _write_arrow(forecast, path)
+
+    entries = sorted(
+        (os.path.join(store_dir, file_name) for file_name in os.listdir(store_dir) if file_name.endswith(".arrow")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    total_bytes = 0
+    for entry in entries:
+        total_bytes += os.path.getsize(entry)
+        if total_bytes > max_bytes and entry != path:
+            os.remove(entry)
+    return path
+
+# One long table of every manufacturer's latest forecast, which chart_data builds the pages' forecast charts from
+def save_forecast_table(forecasts, table_path=FORECAST_TABLE):
+    """Replace the given manufacturers' rows of the forecast table, keeping every other manufacturer's forecast."""
+    os.makedirs(os.path.dirname(table_path), exist_ok=True)
+    tables = [forecast.assign(Manufacturer=manufacturer) for manufacturer, forecast in forecasts.items()]
+    existing = load_forecast_table(table_path)
+    if existing is not None:
+        tables.insert(0, existing[~existing['Manufacturer'].isin(list(forecasts))])
+    table = pd.concat(tables, ignore_index=True).sort_values(['Manufacturer', 'ds'], kind='stable')
+    _write_arrow(table[['Manufacturer', 'ds', 'yhat', 'yhat_lower', 'yhat_upper']], table_path)
+
+def load_forecast_table(table_path=FORECAST_TABLE):
+    """Return every manufacturer's forecast as one table, or None when no forecasts have been saved."""
+    if not os.path.exists(table_path):
+        return None
+    return _read_arrow(table_path)
@@ -1,56 +1,160 @@
+import argparse
+import time
+from importlib.metadata import version
+import numpy as np
 import pandas as pd
-from random_forest_model import aggregated_scores
-from prophet import Prophet
-from prophet.diagnostics import cross_validation, performance_metrics
+from functools import lru_cache
+import joblib
+from joblib import Parallel, delayed
+from data_processing import CACHE_DIR
+from chart_rendering import chart_job, print_render_report, render_charts
+from manufacturer_index import group_by_manufacturer
+from forecast_store import forecast_key, load_forecast, save_forecast, save_forecast_table
+from random_forest_model import get_aggregated_scores
 import matplotlib.pyplot as plt
 import os
 
-# Sorting the aggregated scores by Manufacturer
-manufacturers = aggregated_scores['Manufacturer'].unique()
+# Directory to save the plots
+plots_dir = "manufacturer_forecast_plots"
 
-# Creating individual DataFrames for each Manufacturer
-manufacturer_data = {
-    manufacturer: aggregated_scores[aggregated_scores['Manufacturer'] == manufacturer].reset_index(drop=True)
-    for manufacturer in manufacturers
+# File name of each chart type, relative to plots_dir
+chart_files = {
+    'forecast': "{manufacturer}_forecast_plot.png",
 }
 
-# Directory to save the plots
-plots_dir = "manufacturer_forecast_plots"
-os.makedirs(plots_dir, exist_ok=True)
+# Prophet settings and the number of years forecast past the last observation
+prophet_params = {
+    'yearly_seasonality': True,
+    'changepoint_prior_scale': 0.1,
+    'seasonality_prior_scale': 0.2,
+    'uncertainty_samples': 1000,
+}
+FORECAST_HORIZON = 10
+
+# Forecast periods are dated at the start of their year, like the observed Model Years, by every backend
+FORECAST_FREQ = 'YS'
+
+# Prophet draws its uncertainty intervals from NumPy's global random state; seeding it before every prediction makes
+# a refit reproduce the same intervals, so rebuilt forecasts and chart data do not churn
+UNCERTAINTY_SEED = 42
+
+# Candidate smoothing parameters of the damped-trend backend; every series picks its own combination from the grid.
+# There is no seasonal term: with one observation per year, yearly seasonality is not identifiable.
+damped_trend_grid = {
+    'alpha': np.linspace(0.1, 0.9, 9),  # Level smoothing
+    'beta': np.linspace(0.05, 0.5, 10),  # Trend smoothing, relative to alpha
+    'phi': np.linspace(0.8, 0.98, 10),  # Trend damping
+}
+
+# Coverage of the prediction intervals, the same as Prophet's default uncertainty interval
+INTERVAL_WIDTH = 0.8
+
+# Each manufacturer's last fitted Prophet parameters, used to warm-start its next fit when warm start is turned on
+WARM_START_PATH = os.path.join(CACHE_DIR, "prophet_warm_start.joblib")
+
+# Largest difference in log posterior between a warm-started and a cold fit for both to count as the same optimum.
+# Prophet's posterior can be nearly flat along a ridge, so a warm fit that ends even slightly above the cold one may
+# sit on a different optimum with a very different forecast, one that depends on the fits that ran before.
+WARM_START_TOLERANCE = 0.01
+
+# Worker processes the per-manufacturer fits are spread over; -1 uses every core
+N_JOBS = -1
 
-forecasts = {}
+# Split the aggregated scores into one DataFrame per Manufacturer
+def split_by_manufacturer(aggregated_scores):
+    """Return a dict mapping each manufacturer to its yearly scores sorted by Model Year."""
+    return {
+        manufacturer: data.reset_index(drop=True)
+        for manufacturer, data in group_by_manufacturer(aggregated_scores).items()
+    }
 
-for manufacturer, data in manufacturer_data.items():
+# Smooth the yearly scores and put them in the ds/y layout the forecasters expect
+def prepare_series(data):
+    """Return the manufacturer's 3-year smoothed scores as a ds/y frame."""
     # Apply data smoothing with a rolling mean
-    data['Smoothed Sustainability Score'] = (
+    data = data.assign(**{'Smoothed Sustainability Score': (
         data['Yearly Sustainability Score']
         .rolling(window=3, min_periods=1)  # Smooth over a 3-year window
         .mean()
-    )
+    )})
 
     # Prepare data for the Prophet model
     data = data[['Model Year', 'Smoothed Sustainability Score']]
     data = data.rename(columns={'Model Year': 'ds', 'Smoothed Sustainability Score': 'y'})
     data['ds'] = pd.to_datetime(data['ds'], format='%Y')
+    return data
 
-    # Initialize and fit the Prophet model
-    model = Prophet(
-        yearly_seasonality=True, 
-        changepoint_prior_scale=0.1, 
-        seasonality_prior_scale=0.2
-    )
-    model.fit(data)
+# The MAP parameters of a fitted model, in the form Prophet.fit(init=...) accepts, plus the scales they are expressed in
+def fitted_params(model):
+    """Return the k, m, sigma_obs, delta and beta a fitted Prophet model converged to, with its y and time scales."""
+    params = {name: float(model.params[name][0][0]) for name in ['k', 'm', 'sigma_obs']}
+    params.update({name: np.asarray(model.params[name][0]) for name in ['delta', 'beta']})
+    params.update({'y_scale': float(model.y_scale), 't_scale_days': model.t_scale / pd.Timedelta(days=1)})
+    return params
+
+# Adapt stored parameters to a new version of the series. Prophet fits on y / max|y| and on time scaled to [0, 1]
+# over the history, so a new year rescales the intercept, slopes and coefficients; it also places one changepoint
+# per year in the first 80% of the history, so delta is padded with zeros (or trimmed) to the new changepoint count
+def _warm_start_init(init, data):
+    y_ratio = init['y_scale'] / float(data['y'].abs().max())
+    t_ratio = ((data['ds'].max() - data['ds'].min()) / pd.Timedelta(days=1)) / init['t_scale_days']
+
+    changepoint_range = prophet_params.get('changepoint_range', 0.8)
+    n_changepoints = min(prophet_params.get('n_changepoints', 25), int(np.floor(len(data) * changepoint_range)) - 1)
+    delta = np.zeros(max(n_changepoints, 1))
+    delta[:min(len(delta), len(init['delta']))] = init['delta'][:len(delta)]
+    return {
+        'k': init['k'] * y_ratio * t_ratio,
+        'm': init['m'] * y_ratio,
+        'sigma_obs': init['sigma_obs'] * y_ratio,
+        'delta': delta * y_ratio * t_ratio,
+        'beta': init['beta'] * y_ratio,
+    }
+
+# Fit a Prophet model, starting the optimizer from a previous fit's parameters when given
+def _fit_prophet(data, init=None):
+    # Prophet pulls in cmdstanpy and a compiled Stan model, so it is only imported once a forecast is requested
+    from prophet import Prophet
+
+    model = Prophet(**prophet_params)
+    if init is None:
+        model.fit(data)
+    else:
+        model.fit(data, init=_warm_start_init(init, data))
+    return model
+
+# The log posterior the optimizer stopped at; fits of the same series share its scaling, so their values compare
+def fit_objective(model):
+    """Return the final objective (lp__) of a fitted Prophet model."""
+    return float(model.params['lp__'][0][0])
+
+# Fit Prophet on one manufacturer's series and forecast the next decade
+def forecast_series(data, init=None):
+    """Fit a Prophet model on the ds/y series and return its forecast frame and fitted parameters.
+
+    A fit warm-started from `init` is checked against a cold fit and only kept when it reaches the cold fit's
+    optimum: an objective at least as good, within `WARM_START_TOLERANCE`. Otherwise the cold fit is used, so the
+    forecast only depends on the series and the settings.
+    """
+    model = _fit_prophet(data, init)
+    if init is not None:
+        cold_model = _fit_prophet(data)
+        if abs(fit_objective(model) - fit_objective(cold_model)) > WARM_START_TOLERANCE:
+            model = cold_model
 
     # Create a DataFrame for future years
-    future = model.make_future_dataframe(periods=10, freq='Y')
+    future = model.make_future_dataframe(periods=FORECAST_HORIZON, freq=FORECAST_FREQ)
 
     # Predict future sustainability scores
-    forecast = model.predict(future)
+    np.random.seed(UNCERTAINTY_SEED)
+    return model.predict(future), fitted_params(model)
 
-    # Save forecast results
-    forecasts[manufacturer] = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+def chart_path(chart_type, manufacturer, plots_dir=plots_dir):
+    """Return the file path of one manufacturer's chart."""
+    return os.path.join(plots_dir, chart_files[chart_type].format(manufacturer=manufacturer))
 
-    # Plotting
+def plot_forecast(manufacturer, data, forecast, plots_dir=plots_dir):
+    """Save the plot of the manufacturer's observed scores and forecast."""
     fig, ax = plt.subplots(figsize=(12, 5))  # Wider and slightly larger plot
     fig.patch.set_alpha(0)  # Transparent figure background
     ax.set_facecolor('none')  # Transparent axes background
@@ -85,15 +189,264 @@ for manufacturer, data in manufacturer_data.items():
     plt.tight_layout()
 
     # Save the plot
-    fig.savefig(f"{plots_dir}/{manufacturer}_forecast_plot.png", dpi=300, transparent=True, bbox_inches='tight')  # Minimized space
+    fig.savefig(chart_path('forecast', manufacturer, plots_dir), dpi=300, transparent=True, bbox_inches='tight')  # Minimized space
     plt.close(fig)
 
-    print(f"Saved plot for {manufacturer} to {plots_dir}/{manufacturer}_forecast_plot.png")
+# Fit one manufacturer's forecast inside a worker, timing it and capturing any failure instead of raising
+def _timed_forecast(manufacturer, data, init=None):
+    start = time.perf_counter()
+    try:
+        try:
+            forecast, params = forecast_series(data, init)
+        except Exception:
+            # Stored parameters that no longer fit the series (or an older format) fall back to a cold fit
+            if init is None:
+                raise
+            forecast, params = forecast_series(data)
+        forecast = forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']]
+        error = None
+    except Exception as exc:
+        forecast, params = None, None
+        error = f"{type(exc).__name__}: {exc}"
+    return manufacturer, forecast, time.perf_counter() - start, error, params
+
+def load_warm_start_params(path=WARM_START_PATH):
+    """Return the stored fitted parameters keyed by manufacturer."""
+    if not os.path.exists(path):
+        return {}
+    return joblib.load(path)
+
+def save_warm_start_params(params, path=WARM_START_PATH):
+    """Atomically save the fitted parameters keyed by manufacturer."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(params, tmp_path)
+    os.replace(tmp_path, path)
+
+# Prophet backend: one Stan fit per manufacturer, spread over the process pool
+def prophet_forecasts(series, n_jobs=N_JOBS, warm_start=False):
+    """Return a (manufacturer, forecast, seconds, error) tuple per series, fitting Prophet on each.
+
+    With `warm_start`, each fit starts from the parameters that manufacturer's previous fit converged
+    to, falling back to a cold fit when it does not reach the same optimum, and the new parameters are
+    stored for the next run.
+    """
+    stored = load_warm_start_params() if warm_start else {}
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(_timed_forecast)(manufacturer, data, stored.get(manufacturer)) for manufacturer, data in series.items()
+    )
+    if warm_start:
+        stored.update({manufacturer: params for manufacturer, _, _, error, params in results if error is None})
+        save_warm_start_params(stored)
+    return [(manufacturer, forecast, seconds, error) for manufacturer, forecast, seconds, error, _ in results]
+
+# Time a cold fit against a fit warm-started from the stored parameters, for every manufacturer that has them
+def benchmark_warm_start(aggregated_scores, manufacturers=None):
+    """Return the cold and warm fit times, the speedup and the largest forecast difference per manufacturer."""
+    stored = load_warm_start_params()
+    rows = []
+    for manufacturer, data in split_by_manufacturer(aggregated_scores).items():
+        if manufacturer not in stored or (manufacturers is not None and manufacturer not in manufacturers):
+            continue
+        data = prepare_series(data)
+        _, cold, cold_seconds, cold_error, _ = _timed_forecast(manufacturer, data)
+        _, warm, warm_seconds, warm_error, _ = _timed_forecast(manufacturer, data, stored[manufacturer])
+        if cold_error or warm_error:
+            print(f"Skipping {manufacturer}: {cold_error or warm_error}")
+            continue
+        rows.append((manufacturer, cold_seconds, warm_seconds, cold_seconds / warm_seconds, (cold['yhat'] - warm['yhat']).abs().max()))
+    return pd.DataFrame(rows, columns=['Manufacturer', 'Cold Fit Seconds', 'Warm Fit Seconds', 'Speedup', 'Max Forecast Difference'])
+
+# Run damped-trend exponential smoothing for every parameter candidate and series at once.
+# y is (series, years) and the parameters are (candidates, 1); returns the one-step predictions and final states.
+def _damped_trend_filter(y, alpha, beta, phi):
+    level = np.broadcast_to(y[:, 0], (len(alpha), len(y))).copy()
+    trend = np.broadcast_to(y[:, 1] - y[:, 0], level.shape).copy()
+    predictions = np.empty(level.shape + (y.shape[1],))
+    predictions[..., 0] = y[:, 0]
+    for t in range(1, y.shape[1]):
+        predictions[..., t] = level + phi * trend
+        error = y[:, t] - predictions[..., t]
+        level = predictions[..., t] + alpha * error
+        trend = phi * trend + alpha * beta * error
+    return predictions, level, trend
+
+# Vectorized forecasts for series sharing the same years: grid-search the smoothing parameters of every series
+# together, then extrapolate the damped trend with the analytical ETS(A,Ad,N) prediction intervals
+def _damped_trend_batch(ds, y, horizon=FORECAST_HORIZON, grid=damped_trend_grid, interval_width=INTERVAL_WIDTH):
+    from scipy.stats import norm
+
+    alpha, beta, phi = (values.reshape(-1, 1) for values in np.meshgrid(grid['alpha'], grid['beta'], grid['phi'], indexing='ij'))
+    predictions, level, trend = _damped_trend_filter(y, alpha, beta, phi)
+
+    # The first two years only initialize the level and trend, so they are left out of the fit
+    sse = ((y[:, 2:] - predictions[..., 2:]) ** 2).sum(axis=-1)
+    best = sse.argmin(axis=0)
+    series_index = np.arange(len(y))
+    alpha, beta, phi = alpha[best, 0], beta[best, 0], phi[best, 0]
+    fitted = predictions[best, series_index]
+    sigma = np.sqrt(sse[best, series_index] / max(y.shape[1] - 2, 1))
+
+    steps = np.arange(1, horizon + 1)
+    damping = np.cumsum(phi[:, None] ** steps, axis=1)  # phi + phi^2 + ... + phi^h
+    future = level[best, series_index][:, None] + damping * trend[best, series_index][:, None]
+    # Variance of the h-step error: sigma^2 * (1 + sum over j < h of (alpha * (1 + beta * (phi + ... + phi^j)))^2)
+    shocks = np.concatenate([np.zeros((len(y), 1)), (alpha[:, None] * (1 + beta[:, None] * damping[:, :-1])) ** 2], axis=1)
+    future_sigma = sigma[:, None] * np.sqrt(1 + np.cumsum(shocks, axis=1))
+
+    z = norm.ppf(0.5 + interval_width / 2)
+    yhat = np.concatenate([fitted, future], axis=1)
+    spread = z * np.concatenate([np.broadcast_to(sigma[:, None], fitted.shape), future_sigma], axis=1)
+    future_ds = pd.date_range(ds[-1] + pd.DateOffset(years=1), periods=horizon, freq=FORECAST_FREQ)
+    return ds.append(future_ds), yhat, yhat - spread, yhat + spread
+
+# Damped-trend backend: every manufacturer is forecast in one vectorized NumPy batch per series length
+def damped_trend_forecasts(series, n_jobs=None, warm_start=False):
+    """Return a (manufacturer, forecast, seconds, error) tuple per series, with the batch time shared evenly.
+
+    The closed-form filter has no iterative fit, so there is nothing to warm-start.
+    """
+    results = []
+    batches = {}
+    for manufacturer, data in series.items():
+        if len(data) < 3 or not np.isfinite(data['y'].to_numpy(dtype=float)).all():
+            results.append((manufacturer, None, 0.0, f"ValueError: needs at least 3 finite yearly scores, got {int(np.isfinite(data['y'].to_numpy(dtype=float)).sum())}"))
+        else:
+            batches.setdefault(tuple(data['ds']), []).append(manufacturer)
+
+    for ds, manufacturers in batches.items():
+        start = time.perf_counter()
+        y = np.vstack([series[manufacturer]['y'].to_numpy(dtype=float) for manufacturer in manufacturers])
+        dates, yhat, lower, upper = _damped_trend_batch(pd.DatetimeIndex(ds), y)
+        seconds = (time.perf_counter() - start) / len(manufacturers)
+        for i, manufacturer in enumerate(manufacturers):
+            forecast = pd.DataFrame({'ds': dates, 'yhat': yhat[i], 'yhat_lower': lower[i], 'yhat_upper': upper[i]})
+            results.append((manufacturer, forecast, seconds, None))
+    return results
+
+# Forecasting backends, each mapping {manufacturer: ds/y series}, n_jobs and warm_start to (manufacturer, forecast, seconds, error) tuples
+forecasters = {
+    'prophet': prophet_forecasts,
+    'damped_trend': damped_trend_forecasts,
+}
+DEFAULT_FORECASTER = 'prophet'
+
+# Everything besides the series that determines a forecast, used to address it in the forecast store
+def forecast_settings(forecaster=DEFAULT_FORECASTER, warm_start=False):
+    """Return the backend, its settings and the horizon the forecasts are produced with."""
+    if forecaster == 'prophet':
+        settings = {
+            'forecaster': forecaster, **prophet_params, 'uncertainty_seed': UNCERTAINTY_SEED,
+            'horizon': FORECAST_HORIZON, 'freq': FORECAST_FREQ, 'prophet_version': version('prophet'),
+        }
+        # Warm-started forecasts are stored apart from cold ones, which can always be reproduced from the series
+        if warm_start:
+            settings.update({'warm_start': True, 'warm_start_tolerance': WARM_START_TOLERANCE})
+        return settings
+    return {
+        'forecaster': forecaster,
+        'grid': {name: values.tolist() for name, values in damped_trend_grid.items()},
+        'interval_width': INTERVAL_WIDTH,
+        'horizon': FORECAST_HORIZON,
+        'freq': FORECAST_FREQ,
+    }
+
+# Forecast the given manufacturers (all of them when None) from a table of yearly scores, one pool task per manufacturer
+def forecast_manufacturers(aggregated_scores, manufacturers=None, n_jobs=N_JOBS, use_store=True, forecaster=DEFAULT_FORECASTER, warm_start=False):
+    """Return the ds/y series, the forecasts and a per-fit report of the selected manufacturers.
+
+    Series already forecast with the current backend and settings are served from the forecast store,
+    and only the rest are fitted, from scratch unless `warm_start` is set. A manufacturer whose fit fails is
+    left out of the forecasts and reported with its error, so one bad series does not abort the others.
+    """
+    series = {
+        manufacturer: prepare_series(data)
+        for manufacturer, data in split_by_manufacturer(aggregated_scores).items()
+        if manufacturers is None or manufacturer in manufacturers
+    }
+
+    # Serve unchanged series from the store
+    settings = forecast_settings(forecaster, warm_start)
+    keys = {manufacturer: forecast_key(data, settings) for manufacturer, data in series.items()}
+    forecasts, report_rows = {}, []
+    for manufacturer, key in keys.items():
+        start = time.perf_counter()
+        stored = load_forecast(key) if use_store else None
+        if stored is not None:
+            forecasts[manufacturer] = stored
+            report_rows.append((manufacturer, True, time.perf_counter() - start, None))
+
+    results = forecasters[forecaster](
+        {manufacturer: data for manufacturer, data in series.items() if manufacturer not in forecasts}, n_jobs, warm_start
+    )
+    for manufacturer, forecast, seconds, error in results:
+        if error is None:
+            forecasts[manufacturer] = forecast
+            if use_store:
+                save_forecast(keys[manufacturer], forecast)
+        report_rows.append((manufacturer, False, seconds, error))
+
+    fit_report = pd.DataFrame(report_rows, columns=['Manufacturer', 'Cached', 'Fit Seconds', 'Error'])
+    fit_report = fit_report.sort_values('Manufacturer', ignore_index=True)
+    forecasts = {manufacturer: forecasts[manufacturer] for manufacturer in series if manufacturer in forecasts}
+    return series, forecasts, fit_report
+
+# Forecast every manufacturer once per process, on first use
+@lru_cache(maxsize=None)
+def _forecast_all(forecaster=DEFAULT_FORECASTER):
+    return forecast_manufacturers(get_aggregated_scores(), forecaster=forecaster)
+
+def get_forecasts(forecaster=DEFAULT_FORECASTER):
+    """Return a dict mapping each manufacturer to its ds/yhat/yhat_lower/yhat_upper forecast."""
+    _, forecasts, _ = _forecast_all(forecaster)
+    return {manufacturer: forecast.copy() for manufacturer, forecast in forecasts.items()}
+
+# One forecast chart job per forecast manufacturer
+def chart_jobs(series, forecasts):
+    """Return the forecast chart jobs for the manufacturers in `forecasts`."""
+    return [
+        chart_job('forecast', manufacturer, chart_path('forecast', manufacturer), plot_forecast, manufacturer, series[manufacturer], forecast)
+        for manufacturer, forecast in forecasts.items()
+    ]
+
+def main(manufacturers=None, aggregated_scores=None, n_jobs=N_JOBS, use_store=True, forecaster=DEFAULT_FORECASTER, warm_start=False):
+    """Forecast the given manufacturers (all of them by default) and save their forecast plots."""
+    start = time.perf_counter()
+    if manufacturers is None and aggregated_scores is None and n_jobs == N_JOBS and use_store and not warm_start:
+        series, forecasts, fit_report = _forecast_all(forecaster)
+    else:
+        aggregated_scores = get_aggregated_scores() if aggregated_scores is None else aggregated_scores
+        series, forecasts, fit_report = forecast_manufacturers(
+            aggregated_scores, manufacturers, n_jobs, use_store, forecaster, warm_start
+        )
+    wall_seconds = time.perf_counter() - start
+    save_forecast_table(forecasts)
+
+    print(fit_report[['Manufacturer', 'Cached', 'Fit Seconds']].to_string(index=False))
+    print(
+        f"Forecast {len(fit_report)} manufacturers in {wall_seconds:.1f}s wall time: "
+        f"{fit_report['Cached'].sum()} served from the forecast store, "
+        f"{(~fit_report['Cached']).sum()} fitted ({fit_report['Fit Seconds'].sum():.1f}s of fitting)"
+    )
+    for _, failed in fit_report[fit_report['Error'].notna()].iterrows():
+        print(f"Forecast failed for {failed['Manufacturer']}: {failed['Error']}")
 
+    start = time.perf_counter()
+    render_report = render_charts(chart_jobs(series, forecasts), n_jobs)
+    print_render_report(render_report, time.perf_counter() - start)
 
-# # Cross-validation
-# df_cv = cross_validation(model, initial='730 days', period='180 days', horizon='365 days')
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Forecast every manufacturer's sustainability score and save the plots.")
+    parser.add_argument("--n-jobs", type=int, default=N_JOBS, help="Worker processes for the Prophet fits; -1 uses every core.")
+    parser.add_argument("--refit", action="store_true", help="Refit every forecast instead of reusing the forecast store.")
+    parser.add_argument("--forecaster", choices=list(forecasters), default=DEFAULT_FORECASTER, help="Forecasting backend.")
+    parser.add_argument("--warm-start", action="store_true", help="Start each Prophet fit from the previous fit, keeping it only when it matches a cold fit.")
+    parser.add_argument("--benchmark-warm-start", action="store_true", help="Time cold against warm-started Prophet fits and exit.")
+    args = parser.parse_args()
+    if args.benchmark_warm_start:
+        benchmark = benchmark_warm_start(get_aggregated_scores())
+        print(benchmark.to_string(index=False))
+        print(f"Warm-started fits took {benchmark['Warm Fit Seconds'].sum():.2f}s against {benchmark['Cold Fit Seconds'].sum():.2f}s cold")
+    else:
+        main(n_jobs=args.n_jobs, use_store=not args.refit, forecaster=args.forecaster, warm_start=args.warm_start)
 
-# # Evaluate performance and check if we are getting low values for rmse and mape
-# df_p = performance_metrics(df_cv)
-# print(df_p[['horizon', 'rmse', 'mape']])
\ No newline at end of file
@@ -0,0 +1,58 @@
+import os
+
+# Width, in pixels, the pages display each chart at; charts not listed are shown at DEFAULT_DISPLAY_WIDTH
+DEFAULT_DISPLAY_WIDTH = 1200
+display_widths = {
+    'all_manufacturers_sustainability_growth_updated.png': 1500,  # Home page
+    'comparative_sustainability_boxplot.png': 1500,  # Home page
+}
+
+# Charts are flat colors on a transparent background, so a 256-color palette PNG keeps them sharp at a fraction of
+# the size; it also stays PNG, which Streamlit serves without re-encoding (it converts WebP to PNG on every view)
+PALETTE_COLORS = 256
+
+def variant_path(path, width):
+    """Return the path of the `width`-pixel variant of a chart."""
+    root, _ = os.path.splitext(path)
+    return f"{root}.{width}w.png"
+
+# One variant is written per chart, at the width the pages show it at: Streamlit downsamples and re-encodes any image
+# wider than the width it is asked to show, on every page view, and the server cannot tell a high-DPI screen apart.
+# The 300 dpi PNG itself stays the full-resolution download copy.
+def variant_widths(path):
+    """Return the widths of the variants written for a chart."""
+    return [display_widths.get(os.path.basename(path), DEFAULT_DISPLAY_WIDTH)]
+
+# Downscale a rendered chart to each variant width and palette-quantize it
+def write_image_variants(path, colors=PALETTE_COLORS):
+    """Write the display-size variants of a rendered chart and return their paths."""
+    from PIL import Image
+
+    with Image.open(path) as image:
+        image = image.convert("RGBA")
+
+    written = []
+    for width in variant_widths(path):
+        # Never upscale: a chart narrower than the variant width is only quantized
+        target_width = min(width, image.width)
+        resized = image.resize((target_width, round(image.height * target_width / image.width)), Image.LANCZOS)
+        quantized = resized.quantize(colors=colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+        output_path = variant_path(path, width)
+        tmp_path = f"{output_path}.{os.getpid()}.tmp"
+        quantized.save(tmp_path, format="PNG", optimize=True)
+        os.replace(tmp_path, output_path)
+        written.append(output_path)
+    return written
+
+def missing_variants(path):
+    """Return True when a variant the chart should have has not been written."""
+    return any(not os.path.exists(variant_path(path, width)) for width in variant_widths(path))
+
+# Pick the file a page should show at `width` pixels: the exact-size variant when the build wrote one
+def display_variant(path, width):
+    """Return the smallest variant at least `width` pixels wide, or the full-resolution chart when there is none."""
+    for variant_width in sorted(variant_widths(path)):
+        if variant_width >= width and os.path.exists(variant_path(path, variant_width)):
+            return variant_path(path, variant_width)
+    return path
@@ -0,0 +1,207 @@
+import argparse
+import hashlib
+import os
+import joblib
+import numpy as np
+import pandas as pd
+from data_processing import CACHE_DIR, EMISSIONS_CSV, dataset_version, load_specific_manufacturers_filtered
+from model_registry import artifact_key, load_artifact, save_artifact
+from random_forest_model import MODEL_NAME, engineer_features, load_or_train_model, model_config
+from sustainability_score import aggregate_scores, columns_to_normalize, fit_score_bounds
+
+# Scoring state kept between runs: group fingerprints, per-row predictions and the model they came from
+STATE_PATH = os.path.join(CACHE_DIR, "incremental_scoring_state.joblib")
+
+group_columns = ['Manufacturer', 'Model Year']
+
+# Full-form names used by the plots and forecasts
+manufacturer_names = {'GM': 'General Motors', 'VW': 'Volkswagen'}
+
+# Fingerprint every (Manufacturer, Model Year) group so new and revised groups can be detected
+def group_fingerprints(frame):
+    """Return a Series of content hashes indexed by (Manufacturer, Model Year)."""
+    row_hashes = pd.Series(pd.util.hash_pandas_object(frame, index=False).to_numpy(), index=frame.index)
+    keys = [frame[col] for col in group_columns]
+    return row_hashes.groupby(keys).agg(lambda hashes: hashlib.sha256(hashes.to_numpy().tobytes()).hexdigest())
+
+# Compare the MinMax bounds the stored model was fitted with against the bounds of the new data
+def bound_shifts(artifact, frame):
+    """Return a description of every global MinMax bound that the new data moves."""
+    bounds = fit_score_bounds(frame, artifact['powertrain_weights'])
+    stored = {
+        'Real-World CO2 (g/mi)': (artifact['co2_mpg_scaler'].data_min_[0], artifact['co2_mpg_scaler'].data_max_[0]),
+        'Ton-MPG (Real-World)': (artifact['co2_mpg_scaler'].data_min_[1], artifact['co2_mpg_scaler'].data_max_[1]),
+        'Powertrain Contribution': (artifact['powertrain_scaler'].data_min_[0], artifact['powertrain_scaler'].data_max_[0]),
+    }
+    shifts = []
+    for col, (low, high) in stored.items():
+        new_low, new_high = bounds[col]
+        if not np.allclose([low, high], [new_low, new_high], rtol=1e-12, atol=0):
+            shifts.append(f"{col}: [{low:.6g}, {high:.6g}] -> [{new_low:.6g}, {new_high:.6g}]")
+    return shifts
+
+# Missing CO2 and Ton-MPG values are filled with the column means, which almost any appended year moves. Only the rows
+# with a missing value depend on them, so those rows are rescored with the new means instead of retraining on everything
+def fill_value_shifts(artifact, fill_values):
+    """Return a description of every fill value that moved, keyed by its column."""
+    shifts = {}
+    for col in columns_to_normalize:
+        stored, new = artifact['fill_values'][col], fill_values[col]
+        if not np.isclose(stored, new, rtol=1e-12, atol=0):
+            shifts[col] = f"{col} fill value: {stored:.6g} -> {new:.6g}"
+    return shifts
+
+def refilled_groups(frame, columns):
+    """Return the (Manufacturer, Model Year) groups with a missing value in any of the columns."""
+    missing = frame[list(columns)].isna().any(axis=1)
+    return pd.MultiIndex.from_frame(frame.loc[missing, group_columns]).unique()
+
+def _predict_rows(frame, artifact):
+    engineered, _ = engineer_features(frame, artifact)
+    return engineered[group_columns].assign(**{
+        'Predicted Sustainability Score': artifact['model'].predict(engineered[artifact['features']])
+    })
+
+def load_state(state_path=STATE_PATH):
+    """Return the scoring state saved by the previous run, or None."""
+    if not os.path.exists(state_path):
+        return None
+    return joblib.load(state_path)
+
+def save_state(state, state_path=STATE_PATH):
+    """Atomically save the scoring state for the next run."""
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = f"{state_path}.{os.getpid()}.tmp"
+    joblib.dump(state, tmp_path)
+    os.replace(tmp_path, state_path)
+
+# Retrain (or load from the registry) and score every row
+def _full_rescore(frame, data_version, fingerprints, reason):
+    _, artifact = load_or_train_model(frame, data_version)
+    scored = _predict_rows(frame, artifact)
+    state = {
+        'model_key': artifact_key(data_version, model_config()),
+        'fingerprints': fingerprints,
+        'scored': scored,
+    }
+    report = {
+        'mode': 'full',
+        'reason': reason,
+        'affected_manufacturers': sorted(frame['Manufacturer'].replace(manufacturer_names).unique()),
+    }
+    return state, report
+
+# Score only the new or revised groups when the stored model and its scaling still apply
+def rescore(csv_path=EMISSIONS_CSV, state_path=STATE_PATH, force_full=False):
+    """Update the yearly scores for a new version of the EPA data, rescoring only what changed.
+
+    Returns the aggregated scores and a report of the groups that changed, whether the global
+    MinMax bounds moved (which forces a full rescore) and which manufacturers are affected. When the
+    fill values move, only the groups with a missing value are rescored with the new ones. The model
+    the scores come from is registered, with the new fill values, under the new data version, so
+    random_forest_model.get_aggregated_scores() returns the same scores.
+    """
+    frame = load_specific_manufacturers_filtered(csv_path)
+    data_version = dataset_version(csv_path)
+    fingerprints = group_fingerprints(frame)
+    previous = None if force_full else load_state(state_path)
+
+    if previous is None:
+        state, report = _full_rescore(frame, data_version, fingerprints, 'full rescore requested' if force_full else 'no previous scoring state')
+    else:
+        previous_fingerprints = previous['fingerprints']
+        new_groups = fingerprints.index.difference(previous_fingerprints.index)
+        removed_groups = previous_fingerprints.index.difference(fingerprints.index)
+        common = fingerprints.index.intersection(previous_fingerprints.index)
+        changed_groups = common[fingerprints[common].to_numpy() != previous_fingerprints[common].to_numpy()]
+
+        artifact = load_artifact(MODEL_NAME, previous['model_key'])
+        shifts = bound_shifts(artifact, frame) if artifact is not None else []
+
+        if artifact is None:
+            state, report = _full_rescore(frame, data_version, fingerprints, 'stored model is no longer in the registry')
+        elif artifact['config'] != model_config():
+            state, report = _full_rescore(frame, data_version, fingerprints, 'model configuration changed')
+        elif shifts:
+            state, report = _full_rescore(frame, data_version, fingerprints, 'global MinMax bounds shifted: ' + '; '.join(shifts))
+        else:
+            # The new fill values are the ones a retrain would use; groups whose missing values they change are
+            # rescored along with the new and revised ones, all with the stored model and scalers
+            fill_values = frame[columns_to_normalize].mean().to_dict()
+            fill_shifts = fill_value_shifts(artifact, fill_values)
+            artifact = {**artifact, 'fill_values': fill_values}
+            refilled = refilled_groups(frame, fill_shifts)
+            affected = new_groups.union(changed_groups).union(refilled)
+            row_keys = pd.MultiIndex.from_frame(frame[group_columns])
+            rows = frame[row_keys.isin(affected)]
+            kept = previous['scored'][~pd.MultiIndex.from_frame(previous['scored'][group_columns]).isin(affected.union(removed_groups))]
+            scored = pd.concat([kept, _predict_rows(rows, artifact)], ignore_index=True) if len(rows) else kept
+
+            # The yearly scores are normalized over every row, so new extremes rescale every manufacturer
+            previous_range = previous['scored']['Predicted Sustainability Score'].agg(['min', 'max']).to_numpy()
+            renormalized = not np.array_equal(previous_range, scored['Predicted Sustainability Score'].agg(['min', 'max']).to_numpy())
+
+            # Register the stored model under the new data version, so the pages' scores, which come from the registry
+            # model for the current data, are the incrementally updated ones instead of a retrain
+            model_key = artifact_key(data_version, model_config())
+            if model_key != previous['model_key']:
+                save_artifact(MODEL_NAME, model_key, {
+                    **artifact, 'data_version': data_version, 'trained_on': artifact.get('trained_on', artifact['data_version']),
+                })
+
+            affected_raw = set(affected.get_level_values('Manufacturer')) | set(removed_groups.get_level_values('Manufacturer'))
+            state = {
+                'model_key': model_key,
+                'fingerprints': fingerprints,
+                'scored': scored,
+            }
+            report = {
+                'mode': 'incremental' if len(affected) or len(removed_groups) else 'unchanged',
+                'new_groups': list(new_groups),
+                'changed_groups': list(changed_groups),
+                'fill_value_shifts': list(fill_shifts.values()),
+                'refilled_groups': list(refilled.difference(new_groups.union(changed_groups))),
+                'removed_groups': list(removed_groups),
+                'rescored_rows': len(rows),
+                'renormalized': renormalized,
+                'affected_manufacturers': sorted(
+                    frame['Manufacturer'].replace(manufacturer_names).unique() if renormalized
+                    else {manufacturer_names.get(m, m) for m in affected_raw}
+                ),
+            }
+
+    save_state(state, state_path)
+    return aggregate_scores(state['scored']), report
+
+# Regenerate the forecasts and plots of the affected manufacturers only, from the same CSV the scores came from
+def update_downstream(aggregated_scores, report, csv_path=EMISSIONS_CSV):
+    """Refresh the CO2/MPG plots, advanced visuals and forecasts of the manufacturers in the report."""
+    manufacturers = set(report['affected_manufacturers'])
+    if not manufacturers:
+        return
+
+    import visualizations
+    import manufacturer_advanced_visuals
+    import future_predictions
+
+    emissions_data = load_specific_manufacturers_filtered(csv_path)
+    visualizations.main(manufacturers, emissions_data)
+    manufacturer_advanced_visuals.main(manufacturers, aggregated_scores, emissions_data)
+    future_predictions.main(manufacturers, aggregated_scores)
+
+def main():
+    parser = argparse.ArgumentParser(description="Rescore only the EPA groups that are new or changed since the last run.")
+    parser.add_argument("--csv", default=EMISSIONS_CSV, help="EPA emissions CSV to score.")
+    parser.add_argument("--full", action="store_true", help="Ignore the saved state and rescore everything.")
+    parser.add_argument("--skip-downstream", action="store_true", help="Only update the scores, not the forecasts and plots.")
+    args = parser.parse_args()
+
+    aggregated_scores, report = rescore(args.csv, force_full=args.full)
+    for name, value in report.items():
+        print(f"{name}: {value}")
+
+    if not args.skip_downstream:
+        update_downstream(aggregated_scores, report, args.csv)
+
+if __name__ == "__main__":
+    main()
@@ -1,24 +1,54 @@
-import pandas as pd
 import os
+import time
 import matplotlib.pyplot as plt
-from matplotlib.cm import get_cmap
 from matplotlib.patches import Patch
-import numpy as np
-from random_forest_model import aggregated_scores
-from data_processing import specific_manufacturers_filtered
-
-# Exclude Tesla from the dataset
-aggregated_scores = aggregated_scores[aggregated_scores['Manufacturer'] != 'Tesla']
+from random_forest_model import get_aggregated_scores
+from data_processing import get_specific_manufacturers_filtered
+from data_cleaning import powertrain_columns
+from chart_rendering import N_JOBS, chart_job, print_render_report, render_charts
+from manufacturer_index import group_by_manufacturer
 
 # Directory to save advanced visuals
 plots_dir = "manufacturer_advanced_visuals"
-os.makedirs(plots_dir, exist_ok=True)
+
+# File name of each chart type, relative to plots_dir
+chart_files = {
+    'co2_reduction_rate': "{manufacturer}_co2_reduction_rate.png",
+    'mpg_growth_rate': "{manufacturer}_mpg_growth_rate.png",
+    'sustainability_growth': "all_manufacturers_sustainability_growth_updated.png",
+    'comparative_boxplot': "comparative_sustainability_boxplot.png",
+    'powertrain_pie_chart': "{manufacturer}_powertrain_pie_chart.png",
+}
+
+def chart_path(chart_type, manufacturer=None, plots_dir=plots_dir):
+    """Return the file path of a chart; the all-manufacturer charts take no manufacturer."""
+    return os.path.join(plots_dir, chart_files[chart_type].format(manufacturer=manufacturer))
+
+# Define colors for powertrain categories
+powertrain_colors = {
+    'Powertrain - Diesel': '#ff9999',
+    'Powertrain - Battery Electric Vehicle (BEV)': '#66b3ff',
+    'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)': '#99ff99',
+    'Powertrain - Fuel Cell Electric Vehicle (FCEV)': '#ffcc99',
+    'Powertrain - Other (incl. CNG)': '#c2c2f0',
+    'Powertrain - Gasoline Mild Hybrid/MHEV': '#ffb3e6',
+    'Powertrain - Gasoline Strong Hybrid/HEV': '#c2f0c2',
+    'Powertrain - Gasoline with Start/Stop': '#ff6666',
+    'Powertrain - Gasoline without Start/Stop': '#c2c2c2',
+}
+
+# Load the yearly sustainability scores used by the advanced visuals
+def load_aggregated_scores(aggregated_scores=None):
+    """Return the yearly sustainability scores (the current model's by default) with Tesla excluded."""
+    aggregated_scores = get_aggregated_scores() if aggregated_scores is None else aggregated_scores
+
+    # Exclude Tesla from the dataset
+    return aggregated_scores[aggregated_scores['Manufacturer'] != 'Tesla']
 
 # 1. **CO2 Reduction Rate Over Time (Bar Graph)**
-for manufacturer in aggregated_scores['Manufacturer'].unique():
-    data = aggregated_scores[aggregated_scores['Manufacturer'] == manufacturer]
-    data = data.sort_values(by='Model Year')
-    data['CO2 Reduction Rate (%)'] = data['Yearly Sustainability Score'].pct_change() * 100
+def plot_co2_reduction_rate(manufacturer, data, plots_dir=plots_dir):
+    """Save the manufacturer's year-over-year CO2 reduction rate bar graph."""
+    data = data.assign(**{'CO2 Reduction Rate (%)': data['Yearly Sustainability Score'].pct_change() * 100})
 
     fig, ax = plt.subplots(figsize=(12, 5))
     ax.bar(
@@ -39,14 +69,13 @@ for manufacturer in aggregated_scores['Manufacturer'].unique():
     ax.grid(axis='y', color='gray', linestyle='--', linewidth=0.5, alpha=0.7)  # Transparent gridlines
 
     plt.tight_layout()
-    fig.savefig(f"{plots_dir}/{manufacturer}_co2_reduction_rate.png", dpi=300, transparent=True, bbox_inches='tight')
+    fig.savefig(chart_path('co2_reduction_rate', manufacturer, plots_dir), dpi=300, transparent=True, bbox_inches='tight')
     plt.close(fig)
 
 # 2. **MPG Efficiency Growth Rate (Bar Graph)**
-for manufacturer in aggregated_scores['Manufacturer'].unique():
-    data = aggregated_scores[aggregated_scores['Manufacturer'] == manufacturer]
-    data = data.sort_values(by='Model Year')
-    data['MPG Growth Rate (%)'] = data['Yearly Sustainability Score'].pct_change() * 100
+def plot_mpg_growth_rate(manufacturer, data, plots_dir=plots_dir):
+    """Save the manufacturer's year-over-year MPG growth rate bar graph."""
+    data = data.assign(**{'MPG Growth Rate (%)': data['Yearly Sustainability Score'].pct_change() * 100})
 
     fig, ax = plt.subplots(figsize=(12, 5))
     ax.bar(
@@ -67,139 +96,107 @@ for manufacturer in aggregated_scores['Manufacturer'].unique():
     ax.grid(axis='y', color='gray', linestyle='--', linewidth=0.5, alpha=0.7)  # Transparent gridlines
 
     plt.tight_layout()
-    fig.savefig(f"{plots_dir}/{manufacturer}_mpg_growth_rate.png", dpi=300, transparent=True, bbox_inches='tight')
+    fig.savefig(chart_path('mpg_growth_rate', manufacturer, plots_dir), dpi=300, transparent=True, bbox_inches='tight')
     plt.close(fig)
 
 # 3. **Sustainability Growth Over Time (Line Graph for Each Manufacturer)**
-# Generate a colormap to assign a distinct color to each manufacturer
-unique_manufacturers = aggregated_scores['Manufacturer'].unique()
-cmap = plt.get_cmap('tab20', len(unique_manufacturers))  # Use updated get_cmap
-color_map = {manufacturer: cmap(i) for i, manufacturer in enumerate(unique_manufacturers)}
-
-fig, ax = plt.subplots(figsize=(12, 6))  # Wide layout
+def plot_sustainability_growth(aggregated_scores, plots_dir=plots_dir):
+    """Save the line graph comparing every manufacturer's yearly sustainability score."""
+    # Generate a colormap to assign a distinct color to each manufacturer
+    unique_manufacturers = aggregated_scores['Manufacturer'].unique()
+    cmap = plt.get_cmap('tab20', len(unique_manufacturers))  # Use updated get_cmap
+    color_map = {manufacturer: cmap(i) for i, manufacturer in enumerate(unique_manufacturers)}
+
+    fig, ax = plt.subplots(figsize=(12, 6))  # Wide layout
+
+    for manufacturer, data in group_by_manufacturer(aggregated_scores).items():
+        ax.plot(
+            data['Model Year'],
+            data['Yearly Sustainability Score'],
+            marker='o',
+            color=color_map[manufacturer],  # Assign a distinct color from the colormap
+            label=manufacturer  # Add manufacturer to legend
+        )
+
+    # Graph aesthetic adjustments
+    ax.set_facecolor('none')  # Transparent background
+    fig.patch.set_alpha(0)
+    ax.set_xlabel("Year", fontsize=12, color='white')  # No bold axis titles
+    ax.set_ylabel("Sustainability Score", fontsize=12, color='white')  # Axis title exists
+    ax.tick_params(axis='x', colors='white', labelsize=10)
+    ax.tick_params(axis='y', colors='white', labelsize=10)
 
-for manufacturer in unique_manufacturers:
-    data = aggregated_scores[aggregated_scores['Manufacturer'] == manufacturer]
-    data = data.sort_values(by='Model Year')
-    
-    ax.plot(
-        data['Model Year'],
-        data['Yearly Sustainability Score'],
-        marker='o',
-        color=color_map[manufacturer],  # Assign a distinct color from the colormap
-        label=manufacturer  # Add manufacturer to legend
+    # Adding a nice rounded legend with white font
+    legend = ax.legend(
+        loc="upper left",
+        fontsize=10,
+        frameon=True,
+        facecolor='none',  # Transparent background for the legend
+        edgecolor='white'
     )
 
-# Graph aesthetic adjustments
-ax.set_facecolor('none')  # Transparent background
-fig.patch.set_alpha(0)
-ax.set_xlabel("Year", fontsize=12, color='white')  # No bold axis titles
-ax.set_ylabel("Sustainability Score", fontsize=12, color='white')  # Axis title exists
-ax.tick_params(axis='x', colors='white', labelsize=10)
-ax.tick_params(axis='y', colors='white', labelsize=10)
-
-# Adding a nice rounded legend with white font
-legend = ax.legend(
-    loc="upper left",
-    fontsize=10,
-    frameon=True,
-    facecolor='none',  # Transparent background for the legend
-    edgecolor='white'
-)
-
-# Adjust font color in legend manually
-for text in legend.get_texts():
-    text.set_color('white')
-
-legend.get_frame().set_linewidth(0.8)
-
-# Save the plot
-plt.tight_layout()
-fig.savefig(f"{plots_dir}/all_manufacturers_sustainability_growth_updated.png", dpi=300, transparent=True, bbox_inches='tight')
-plt.close(fig)
+    # Adjust font color in legend manually
+    for text in legend.get_texts():
+        text.set_color('white')
 
-# 4. **Comparative Boxplot for Sustainability Scores**
-fig, ax = plt.subplots(figsize=(10, 6))  # Adjusted dimensions
-aggregated_scores.boxplot(
-    by='Manufacturer',
-    column=['Yearly Sustainability Score'],
-    grid=False,
-    patch_artist=True,
-    boxprops=dict(facecolor='#6B8E23', color='white'),  # Updated face color
-    medianprops=dict(color='white'),
-    whiskerprops=dict(color='white'),
-    capprops=dict(color='white'),
-    flierprops=dict(marker='o', markerfacecolor='#6B8E23', markeredgecolor='white', markersize=6),  # Ensure flier visibility
-    ax=ax
-)
-ax.set_facecolor('none')  # Transparent background
-fig.patch.set_alpha(0)
-
-# Add x-axis and y-axis titles with white color
-ax.set_xlabel("Manufacturer", fontsize=12, color='white')  # Explicitly set x-axis title
-ax.set_ylabel("Yearly Sustainability Score", fontsize=12, color='white')  # Add y-axis title
-
-# Customize tick parameters
-ax.tick_params(axis='x', colors='white', labelsize=10, rotation=45)
-ax.tick_params(axis='y', colors='white', labelsize=10)
-
-# Remove default Matplotlib titles
-ax.set_title("")
-plt.suptitle("")
-
-plt.tight_layout()
-fig.savefig(f"{plots_dir}/comparative_sustainability_boxplot.png", dpi=300, transparent=True, bbox_inches='tight')
-plt.close(fig)
+    legend.get_frame().set_linewidth(0.8)
 
-# 5. **Powertrain Pie Chart for Each Manufacturer**
-# Replace Manufacturer names in the specific_manufacturers_filtered DataFrame to their full-form names
-specific_manufacturers_filtered['Manufacturer'] = specific_manufacturers_filtered['Manufacturer'].replace({
-    'VW': 'Volkswagen',
-    'GM': 'General Motors'
-})
-
-# Clean the powertrain columns
-powertrain_columns = [
-    'Powertrain - Diesel', 
-    'Powertrain - Battery Electric Vehicle (BEV)',
-    'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)',
-    'Powertrain - Fuel Cell Electric Vehicle (FCEV)',
-    'Powertrain - Other (incl. CNG)',
-    'Powertrain - Gasoline Mild Hybrid/MHEV',
-    'Powertrain - Gasoline Strong Hybrid/HEV',
-    'Powertrain - Gasoline with Start/Stop',
-    'Powertrain - Gasoline without Start/Stop'
-]
-
-for powertrain in powertrain_columns:
-    specific_manufacturers_filtered[powertrain] = specific_manufacturers_filtered[powertrain].replace('-', 0)
-    specific_manufacturers_filtered[powertrain] = specific_manufacturers_filtered[powertrain].astype(str)
-    
-    # Detect if value is a percentage and convert to decimal
-    specific_manufacturers_filtered[powertrain] = specific_manufacturers_filtered[powertrain].apply(
-        lambda x: float(x.strip('%')) / 100 if '%' in x else float(x)
+    # Save the plot
+    plt.tight_layout()
+    fig.savefig(chart_path('sustainability_growth', plots_dir=plots_dir), dpi=300, transparent=True, bbox_inches='tight')
+    plt.close(fig)
+
+# 4. **Comparative Boxplot for Sustainability Scores**
+def plot_comparative_boxplot(aggregated_scores, plots_dir=plots_dir):
+    """Save the boxplot comparing the distribution of yearly scores per manufacturer."""
+    fig, ax = plt.subplots(figsize=(10, 6))  # Adjusted dimensions
+    aggregated_scores.boxplot(
+        by='Manufacturer',
+        column=['Yearly Sustainability Score'],
+        grid=False,
+        patch_artist=True,
+        boxprops=dict(facecolor='#6B8E23', color='white'),  # Updated face color
+        medianprops=dict(color='white'),
+        whiskerprops=dict(color='white'),
+        capprops=dict(color='white'),
+        flierprops=dict(marker='o', markerfacecolor='#6B8E23', markeredgecolor='white', markersize=6),  # Ensure flier visibility
+        ax=ax
     )
+    ax.set_facecolor('none')  # Transparent background
+    fig.patch.set_alpha(0)
 
-# Define colors for powertrain categories
-powertrain_colors = {
-    'Powertrain - Diesel': '#ff9999',
-    'Powertrain - Battery Electric Vehicle (BEV)': '#66b3ff',
-    'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)': '#99ff99',
-    'Powertrain - Fuel Cell Electric Vehicle (FCEV)': '#ffcc99',
-    'Powertrain - Other (incl. CNG)': '#c2c2f0',
-    'Powertrain - Gasoline Mild Hybrid/MHEV': '#ffb3e6',
-    'Powertrain - Gasoline Strong Hybrid/HEV': '#c2f0c2',
-    'Powertrain - Gasoline with Start/Stop': '#ff6666',
-    'Powertrain - Gasoline without Start/Stop': '#c2c2c2',
-}
+    # Add x-axis and y-axis titles with white color
+    ax.set_xlabel("Manufacturer", fontsize=12, color='white')  # Explicitly set x-axis title
+    ax.set_ylabel("Yearly Sustainability Score", fontsize=12, color='white')  # Add y-axis title
+
+    # Customize tick parameters
+    ax.tick_params(axis='x', colors='white', labelsize=10, rotation=45)
+    ax.tick_params(axis='y', colors='white', labelsize=10)
+
+    # Remove default Matplotlib titles
+    ax.set_title("")
+    plt.suptitle("")
+
+    plt.tight_layout()
+    fig.savefig(chart_path('comparative_boxplot', plots_dir=plots_dir), dpi=300, transparent=True, bbox_inches='tight')
+    plt.close(fig)
+
+# 5. **Powertrain Pie Chart for Each Manufacturer**
+def load_powertrain_data(model_year=2024, emissions_data=None):
+    """Return the cleaned powertrain shares for one model year of the filtered EPA data (the default CSV's unless given) with full manufacturer names."""
+    specific_manufacturers_filtered = get_specific_manufacturers_filtered() if emissions_data is None else emissions_data.copy()
 
-# Filter for 2024 data
-specific_2024 = specific_manufacturers_filtered[specific_manufacturers_filtered['Model Year'] == 2024]
+    # Replace Manufacturer names in the specific_manufacturers_filtered DataFrame to their full-form names
+    specific_manufacturers_filtered['Manufacturer'] = specific_manufacturers_filtered['Manufacturer'].replace({
+        'VW': 'Volkswagen',
+        'GM': 'General Motors'
+    })
 
-for manufacturer in specific_2024['Manufacturer'].unique():
-    # Filter rows for the specific manufacturer
-    manufacturer_data = specific_2024[specific_2024['Manufacturer'] == manufacturer]
+    # Filter for the requested model year
+    return specific_manufacturers_filtered[specific_manufacturers_filtered['Model Year'] == model_year]
 
+def plot_powertrain_pie_chart(manufacturer, manufacturer_data, plots_dir=plots_dir):
+    """Save the manufacturer's powertrain distribution pie chart."""
     # Aggregate the powertrain columns by summing
     powertrain_distribution = manufacturer_data[powertrain_columns].sum()
 
@@ -242,11 +239,42 @@ for manufacturer in specific_2024['Manufacturer'].unique():
     # Save the pie chart
     plt.tight_layout()
     fig.savefig(
-        f"{plots_dir}/{manufacturer}_powertrain_pie_chart.png",
+        chart_path('powertrain_pie_chart', manufacturer, plots_dir),
         dpi=300,
         transparent=True,
         bbox_inches='tight',
     )
     plt.close(fig)
 
-print("All advanced visuals have been successfully created.")
\ No newline at end of file
+# Rate charts and pie charts per manufacturer, plus the two charts comparing every manufacturer
+def chart_jobs(manufacturers=None, aggregated_scores=None, emissions_data=None):
+    """Return the advanced visual chart jobs, limiting the per-manufacturer charts to `manufacturers` when given."""
+    aggregated_scores = load_aggregated_scores(aggregated_scores)
+    jobs = []
+
+    for manufacturer, data in group_by_manufacturer(aggregated_scores).items():
+        if manufacturers is not None and manufacturer not in manufacturers:
+            continue
+        for chart_type, plot_function in [('co2_reduction_rate', plot_co2_reduction_rate), ('mpg_growth_rate', plot_mpg_growth_rate)]:
+            jobs.append(chart_job(chart_type, manufacturer, chart_path(chart_type, manufacturer), plot_function, manufacturer, data))
+
+    jobs.append(chart_job('sustainability_growth', None, chart_path('sustainability_growth'), plot_sustainability_growth, aggregated_scores))
+    jobs.append(chart_job('comparative_boxplot', None, chart_path('comparative_boxplot'), plot_comparative_boxplot, aggregated_scores))
+
+    for manufacturer, manufacturer_data in group_by_manufacturer(load_powertrain_data(emissions_data=emissions_data)).items():
+        if manufacturers is not None and manufacturer not in manufacturers:
+            continue
+        jobs.append(chart_job(
+            'powertrain_pie_chart', manufacturer, chart_path('powertrain_pie_chart', manufacturer),
+            plot_powertrain_pie_chart, manufacturer, manufacturer_data
+        ))
+    return jobs
+
+def main(manufacturers=None, aggregated_scores=None, emissions_data=None, n_jobs=N_JOBS):
+    """Regenerate the advanced visuals, limiting the per-manufacturer charts to `manufacturers` when given."""
+    start = time.perf_counter()
+    report = render_charts(chart_jobs(manufacturers, aggregated_scores, emissions_data), n_jobs)
+    print_render_report(report, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
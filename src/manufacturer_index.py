@@ -0,0 +1,19 @@
+import numpy as np
+
+# Split a frame into per-manufacturer blocks with a single sort, so each manufacturer's rows are one contiguous slice,
+# instead of scanning the whole frame with a boolean mask for every manufacturer and every chart
+def group_by_manufacturer(frame, sort_by='Model Year'):
+    """Return a dict mapping each manufacturer, in order of first appearance, to its rows sorted by `sort_by`.
+
+    The values are slices of one sorted frame and keep the original index labels; treat them as read-only.
+    """
+    if frame.empty:
+        return {}
+    order = frame['Manufacturer'].unique()
+    ordered = frame.sort_values(['Manufacturer', sort_by], kind='stable')
+
+    # A new block starts wherever the manufacturer changes
+    manufacturers = ordered['Manufacturer'].to_numpy()
+    starts = np.flatnonzero(np.r_[True, manufacturers[1:] != manufacturers[:-1]])
+    blocks = dict(zip(manufacturers[starts], zip(starts, np.r_[starts[1:], len(manufacturers)])))
+    return {manufacturer: ordered.iloc[blocks[manufacturer][0]:blocks[manufacturer][1]] for manufacturer in order}
@@ -0,0 +1,49 @@
+import hashlib
+import json
+import os
+import joblib
+
+# Directory holding the serialized model artifacts, and how many versions of each model to keep around
+MODEL_DIR = "models"
+KEEP_VERSIONS = 3
+
+# Key an artifact by the data it was trained on and the configuration it was trained with
+def artifact_key(data_version, config):
+    """Return a short hash identifying the artifact trained on `data_version` with `config`."""
+    payload = json.dumps({"data": data_version, "config": config}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def artifact_path(name, key, model_dir=MODEL_DIR):
+    """Return the file path of the `name` artifact with the given key."""
+    return os.path.join(model_dir, f"{name}_{key}.joblib")
+
+# Load a previously saved artifact, treating unreadable files as a cache miss
+def load_artifact(name, key, model_dir=MODEL_DIR):
+    """Return the stored artifact for `name` and `key`, or None when it has not been saved yet."""
+    path = artifact_path(name, key, model_dir)
+    if not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path)
+    except Exception as e:
+        print(f"Ignoring unreadable model artifact {path}: {e}")
+        return None
+
+# Save an artifact atomically and prune the oldest versions of the same model
+def save_artifact(name, key, artifact, model_dir=MODEL_DIR, keep_versions=KEEP_VERSIONS):
+    """Serialize the artifact under `name` and `key`, keeping only the newest `keep_versions` versions."""
+    os.makedirs(model_dir, exist_ok=True)
+    path = artifact_path(name, key, model_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(artifact, tmp_path)
+    os.replace(tmp_path, path)
+
+    versions = sorted(
+        (os.path.join(model_dir, file_name) for file_name in os.listdir(model_dir)
+         if file_name.startswith(f"{name}_") and file_name.endswith(".joblib")),
+        key=os.path.getmtime,
+        reverse=True
+    )
+    for stale_path in versions[keep_versions:]:
+        os.remove(stale_path)
+    return path
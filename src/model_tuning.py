@@ -0,0 +1,124 @@
+import argparse
+import itertools
+import os
+import random
+import time
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.metrics import mean_squared_error
+from sklearn.model_selection import KFold
+from data_processing import get_specific_manufacturers_filtered
+from random_forest_model import engineer_features, features, powertrain_weights
+
+# Feature subsets to try: everything, or only the powertrains that carry weight in the score plus the two metrics
+feature_sets = {
+    'all': features,
+    'weighted_powertrains': [col for col, weight in powertrain_weights.items() if weight > 0] + ['Ton-MPG (Real-World)', 'Inverted CO2'],
+}
+
+# Hyperparameter search space
+param_grid = {
+    'n_estimators': [10, 25, 50, 100, 200],
+    'max_depth': [None, 8, 12, 16],
+    'max_features': [1.0, 0.5, 'sqrt'],
+    'feature_set': list(feature_sets),
+}
+
+# Where the per-configuration results are written
+RESULTS_PATH = "data/model_tuning_results.csv"
+
+# Build the list of configurations to evaluate, either the full grid or a random sample of it
+def candidate_configs(search='grid', n_iter=20, random_state=42):
+    """Return the configurations to evaluate as a list of dicts."""
+    keys = list(param_grid)
+    configs = [dict(zip(keys, values)) for values in itertools.product(*param_grid.values())]
+    if search == 'random':
+        configs = random.Random(random_state).sample(configs, min(n_iter, len(configs)))
+    return configs
+
+# k-fold cross-validate one configuration, timing its fits and predictions
+def evaluate_config(config, frame, folds=5, random_state=42):
+    """Return the CV MSE, timings and mean feature importances of one configuration."""
+    X = frame[feature_sets[config['feature_set']]].to_numpy()
+    y = frame['Sustainability Score'].to_numpy()
+
+    fold_mse, fit_seconds, predict_seconds, importances = [], [], [], []
+    for train_index, test_index in KFold(n_splits=folds, shuffle=True, random_state=random_state).split(X):
+        model = RandomForestRegressor(
+            n_estimators=config['n_estimators'],
+            max_depth=config['max_depth'],
+            max_features=config['max_features'],
+            random_state=random_state,
+            n_jobs=1
+        )
+        start = time.perf_counter()
+        model.fit(X[train_index], y[train_index])
+        fit_seconds.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        y_pred = model.predict(X[test_index])
+        predict_seconds.append(time.perf_counter() - start)
+
+        fold_mse.append(mean_squared_error(y[test_index], y_pred))
+        importances.append(model.feature_importances_)
+
+    result = {
+        **config,
+        'cv_mse_mean': np.mean(fold_mse),
+        'cv_mse_std': np.std(fold_mse),
+        'fit_seconds': np.mean(fit_seconds),
+        'predict_seconds': np.mean(predict_seconds),
+    }
+    for feature, importance in zip(feature_sets[config['feature_set']], np.mean(importances, axis=0)):
+        result[f"importance: {feature}"] = importance
+    return result
+
+# Evaluate every configuration in parallel, one configuration per worker
+def tune(search='grid', n_iter=20, folds=5, n_jobs=-1, random_state=42):
+    """Return a DataFrame with one row of CV results per configuration, and the total wall time."""
+    frame, _ = engineer_features(get_specific_manufacturers_filtered())
+    configs = candidate_configs(search, n_iter, random_state)
+
+    start = time.perf_counter()
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(evaluate_config)(config, frame, folds, random_state) for config in configs
+    )
+    wall_seconds = time.perf_counter() - start
+    return pd.DataFrame(results), wall_seconds
+
+# Pick the smallest, then fastest, configuration that meets the accuracy threshold
+def select_config(results, mse_threshold):
+    """Return the chosen row of `results`, or None when no configuration meets `mse_threshold`."""
+    eligible = results[results['cv_mse_mean'] <= mse_threshold]
+    if eligible.empty:
+        return None
+    return eligible.sort_values(['n_estimators', 'fit_seconds', 'cv_mse_mean']).iloc[0]
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validate and tune the sustainability Random Forest.")
+    parser.add_argument("--search", choices=["grid", "random"], default="grid", help="Evaluate the full grid or a random sample of it.")
+    parser.add_argument("--n-iter", type=int, default=20, help="Number of configurations sampled by the random search.")
+    parser.add_argument("--folds", type=int, default=5, help="Number of cross-validation folds.")
+    parser.add_argument("--n-jobs", type=int, default=-1, help="Parallel workers; -1 uses every core.")
+    parser.add_argument("--mse-threshold", type=float, default=1e-4, help="Largest acceptable mean CV MSE.")
+    parser.add_argument("--output", default=RESULTS_PATH, help="CSV file the per-configuration results are written to.")
+    args = parser.parse_args()
+
+    results, wall_seconds = tune(args.search, args.n_iter, args.folds, args.n_jobs)
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    results.to_csv(args.output, index=False)
+
+    summary_columns = ['n_estimators', 'max_depth', 'max_features', 'feature_set', 'cv_mse_mean', 'fit_seconds', 'predict_seconds']
+    print(results[summary_columns].sort_values('cv_mse_mean').to_string(index=False))
+    print(f"Evaluated {len(results)} configurations x {args.folds} folds in {wall_seconds:.1f}s; results saved to {args.output}")
+
+    chosen = select_config(results, args.mse_threshold)
+    if chosen is None:
+        print(f"No configuration reached a mean CV MSE of {args.mse_threshold}.")
+    else:
+        print(f"Smallest and fastest configuration within the threshold:\n{chosen[summary_columns].to_string()}")
+
+if __name__ == "__main__":
+    main()
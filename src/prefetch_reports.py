@@ -0,0 +1,58 @@
+import argparse
+import glob
+import os
+import time
+from ai_sentiment_analysis import CACHE_VERSION, N_JOBS, prefetch_pdf_text
+from data_processing import file_hash
+from document_store import DOCUMENT_STORE_DIR, document_path, load_document
+
+# Sustainability reports the Manufacturer Analysis page scores, one PDF per manufacturer
+REPORTS_DIR = "sustainability_reports"
+
+# Kinds of the documents extracted from the bundled reports, which are committed so a fresh deployment serves them
+REPORT_KINDS = ("pdf", "pdf_page")
+
+def report_paths(reports_dir=REPORTS_DIR):
+    """Return the paths of every sustainability report, sorted."""
+    return sorted(glob.glob(os.path.join(reports_dir, "*.pdf")))
+
+# Remove the report documents no bundled report refers to any more, such as the pages of a replaced report, so the
+# committed store only holds the current text. Nothing is removed unless every report's page list is stored.
+def prune_report_documents(pdf_paths, store_dir=DOCUMENT_STORE_DIR):
+    """Delete the 'pdf' and 'pdf_page' documents of reports that are no longer bundled and return how many were removed."""
+    keep = set()
+    for pdf_path in pdf_paths:
+        pdf_key = file_hash(pdf_path)
+        document = load_document("pdf", pdf_key, CACHE_VERSION, store_dir)
+        if document is None:
+            return 0
+        keep.add(document_path("pdf", pdf_key, store_dir))
+        keep.update(document_path("pdf_page", page_hash, store_dir) for page_hash in document["content"])
+
+    removed = 0
+    for kind in REPORT_KINDS:
+        kind_dir = os.path.join(store_dir, kind)
+        for file_name in os.listdir(kind_dir) if os.path.isdir(kind_dir) else []:
+            if os.path.join(kind_dir, file_name) not in keep:
+                os.remove(os.path.join(kind_dir, file_name))
+                removed += 1
+    return removed
+
+# Fill the document store with the page text of every report, so the page never extracts a report on first view.
+# Pages already stored under their content hash are not extracted again.
+def main():
+    parser = argparse.ArgumentParser(description="Extract and store the page text of every sustainability report.")
+    parser.add_argument("--reports-dir", default=REPORTS_DIR, help="Directory of the report PDFs.")
+    parser.add_argument("--store-dir", default=DOCUMENT_STORE_DIR, help="Document store the page text is written to.")
+    parser.add_argument("--n-jobs", type=int, default=N_JOBS, help="Worker processes for the extraction; -1 uses every core.")
+    args = parser.parse_args()
+
+    pdf_paths = report_paths(args.reports_dir)
+    for pdf_path in pdf_paths:
+        start = time.perf_counter()
+        paragraphs, num_pages = prefetch_pdf_text(pdf_path, args.store_dir, args.n_jobs)
+        print(f"{pdf_path}: {num_pages} pages, {len(paragraphs)} relevant paragraphs in {time.perf_counter() - start:.1f}s")
+    print(f"Removed {prune_report_documents(pdf_paths, args.store_dir)} documents of reports that are no longer bundled")
+
+if __name__ == "__main__":
+    main()
@@ -1,147 +1,215 @@
-import pandas as pd
-import numpy as np
-from data_processing import specific_manufacturers_filtered
+import sklearn
+import time
+from functools import lru_cache
+from data_processing import dataset_version, get_specific_manufacturers_filtered
+from data_cleaning import powertrain_columns
+from sustainability_score import (
+    aggregate_scores, columns_to_normalize, exact_sustainability_scores, fit_score_bounds,
+    get_exact_aggregated_scores, get_exact_scored_data, powertrain_weights, score_weights
+)
+from model_registry import artifact_key, load_artifact, save_artifact
+from manufacturer_index import group_by_manufacturer
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import MinMaxScaler
 from sklearn.model_selection import train_test_split
-from sklearn.metrics import make_scorer, mean_squared_error
-from sklearn.model_selection import cross_val_score
-
-# Normalize Relevant Numerical Columns
-columns_to_normalize = ['Real-World CO2 (g/mi)', 'Ton-MPG (Real-World)']
-specific_manufacturers_filtered[columns_to_normalize] = specific_manufacturers_filtered[columns_to_normalize].replace('-', None).astype(float)
-specific_manufacturers_filtered[columns_to_normalize] = specific_manufacturers_filtered[columns_to_normalize].fillna(specific_manufacturers_filtered[columns_to_normalize].mean())
-scaler = MinMaxScaler()
-specific_manufacturers_filtered[columns_to_normalize] = scaler.fit_transform(specific_manufacturers_filtered[columns_to_normalize])
-
-# Invert CO2 to align higher values with better sustainability
-specific_manufacturers_filtered['Inverted CO2'] = 1 - specific_manufacturers_filtered['Real-World CO2 (g/mi)']
-
-# Define powertrain columns and weights
-powertrain_columns = [
-    'Powertrain - Diesel', 
-    'Powertrain - Battery Electric Vehicle (BEV)',
-    'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)',
-    'Powertrain - Fuel Cell Electric Vehicle (FCEV)',
-    'Powertrain - Other (incl. CNG)',
-    'Powertrain - Gasoline Mild Hybrid/MHEV',
-    'Powertrain - Gasoline Strong Hybrid/HEV',
-    'Powertrain - Gasoline with Start/Stop',
-    'Powertrain - Gasoline without Start/Stop'
-]
-
-# Clean and convert Powertrain columns
-for powertrain in powertrain_columns:
-    specific_manufacturers_filtered[powertrain] = specific_manufacturers_filtered[powertrain].replace('-', 0)
-    specific_manufacturers_filtered[powertrain] = specific_manufacturers_filtered[powertrain].astype(str)
-    
-    # Detect if value is a percentage and convert to decimal
-    specific_manufacturers_filtered[powertrain] = specific_manufacturers_filtered[powertrain].apply(
-        lambda x: float(x.strip('%')) / 100 if '%' in x else float(x)
-    )
+from sklearn.metrics import mean_squared_error
 
-# Assign weights to powertrain columns according to their contribution to sustainability, and make sure they add up to 1
-powertrain_weights = {
-    'Powertrain - Diesel': 0.000,  # No contribution due to high emissions
-    'Powertrain - Battery Electric Vehicle (BEV)': 0.35,  # Highest positive weight for sustainability
-    'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)': 0.25,  # Transitional technology
-    'Powertrain - Fuel Cell Electric Vehicle (FCEV)': 0.20,  # Promising but less widespread
-    'Powertrain - Other (incl. CNG)': 0.03,  # Moderate weight for cleaner alternatives
-    'Powertrain - Gasoline Mild Hybrid/MHEV': 0.07,  # Small positive impact
-    'Powertrain - Gasoline Strong Hybrid/HEV': 0.10,  # Stronger hybrid sustainability
-    'Powertrain - Gasoline with Start/Stop': 0.00,  # No contribution to sustainability
-    'Powertrain - Gasoline without Start/Stop': 0.000  # No contribution due to inefficiency
-}
-
-# Initializing the powertrain contribution columnn for each 
-specific_manufacturers_filtered['Powertrain Contribution'] = 0
-
-# Calculate weighted sum for powertrain columns
-for col, weight in powertrain_weights.items():
-    specific_manufacturers_filtered['Powertrain Contribution'] += specific_manufacturers_filtered[col] * weight
-
-# Applying normalization to the Powertrain Contribution so that its not underepresented in the final score and has contribution proportional to the other features
-specific_manufacturers_filtered['Powertrain Contribution'] = scaler.fit_transform(specific_manufacturers_filtered[['Powertrain Contribution']])
-
-# Manually combine into Sustainability Score, a benchmark with which we can train the Random Forest Model and evaluate the values it predicts
-specific_manufacturers_filtered['Sustainability Score'] = (
-    specific_manufacturers_filtered['Inverted CO2'] * 0.4 +
-    specific_manufacturers_filtered['Ton-MPG (Real-World)'] * 0.3 +
-    specific_manufacturers_filtered['Powertrain Contribution'] * 0.3
-)
-
-# Combine features and target
+# Features the Random Forest is trained on
 features = powertrain_columns + ['Ton-MPG (Real-World)', 'Inverted CO2']
-X = specific_manufacturers_filtered[features]
-y = specific_manufacturers_filtered['Sustainability Score']
-
-# Split data into training and testing
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-# Train Random Forest Model
-random_forest = RandomForestRegressor(n_estimators=100, random_state=42)
-random_forest.fit(X_train, y_train)
-
-# Evaluate the Model
-y_pred_test = random_forest.predict(X_test)
-mse_test = mean_squared_error(y_test, y_pred_test)
-print(f"Random Forest Test MSE: {mse_test}")
-
-# Predict Sustainability Scores for All Data
-specific_manufacturers_filtered['Predicted Sustainability Score'] = random_forest.predict(X)
-
-# Normalize scores to [0, 100]
-specific_manufacturers_filtered['Sustainability Score (Normalized)'] = (
-    100 * (specific_manufacturers_filtered['Predicted Sustainability Score'] - 
-           specific_manufacturers_filtered['Predicted Sustainability Score'].min()) / 
-           (specific_manufacturers_filtered['Predicted Sustainability Score'].max() - 
-            specific_manufacturers_filtered['Predicted Sustainability Score'].min())
-)
-
-# Group by Manufacturer and Model Year to retain scores for each year
-aggregated_scores = specific_manufacturers_filtered.groupby(
-    ['Manufacturer', 'Model Year'], as_index=False
-).agg({'Sustainability Score (Normalized)': 'mean'})
-
-# Rename the column to make it more descriptive
-aggregated_scores.rename(columns={'Sustainability Score (Normalized)': 'Yearly Sustainability Score'}, inplace=True)
-
-# Renaming VW and GM to their full form Manufacturer Names
-aggregated_scores['Manufacturer'] = aggregated_scores['Manufacturer'].replace({
-    'GM': 'General Motors',
-    'VW': 'Volkswagen'
-})
-
 
-# # Save results to a CSV file
-# aggregated_scores.to_csv("random_forest_model_results.csv", index=False)
-# print("Random Forest Model results saved to random_forest_model_results.csv")
-
-# '''Testing the Model's Accuracy as well as measuring how each feature/metric contributes to the Sustainability Score for the Manufacturer in that given year'''
-# # Define a custom scorer for MSE
-# mse_scorer = make_scorer(mean_squared_error, greater_is_better=False)
-
-# # Perform k-fold cross-validation
-# k = 5  # Number of folds
-# cv_scores = cross_val_score(random_forest, X, y, cv=k, scoring=mse_scorer)
-
-# # Convert negative MSE to positive
-# cv_scores = -cv_scores
-
-# print(f"Cross-Validation MSE scores for each fold: {cv_scores}")
-# print(f"Average Cross-Validation MSE: {np.mean(cv_scores)}")
-
-# # Get feature importances from the Random Forest model
-# feature_importances = random_forest.feature_importances_
-
-# # Create a DataFrame to visualize the feature importance
-# features_df = pd.DataFrame({
-#     'Feature': features,  # Replace with the feature names used in your model
-#     'Importance': feature_importances
-# })
+# Random Forest hyperparameters and the share of the data held out for testing
+random_forest_params = {'n_estimators': 100, 'random_state': 42}
+test_size = 0.2
+
+# Name of the trained model in the model registry
+MODEL_NAME = "sustainability_random_forest"
+
+# Everything apart from the data that determines the trained model, used to key its stored artifact
+def model_config():
+    """Return the feature, weighting and hyperparameter configuration of the Random Forest."""
+    return {
+        'features': features,
+        'columns_to_normalize': columns_to_normalize,
+        'powertrain_weights': powertrain_weights,
+        'score_weights': score_weights,
+        'random_forest_params': random_forest_params,
+        'test_size': test_size,
+        'sklearn_version': sklearn.__version__,
+    }
+
+# Normalize the raw metrics and derive the model features along with the benchmark Sustainability Score
+def engineer_features(frame, preprocessing=None):
+    """Return the scored feature frame plus its preprocessing: the fill values and the fitted CO2/Ton-MPG and Powertrain Contribution scalers.
+
+    Passing the preprocessing of a stored model reuses its fill values and scalers instead of fitting new ones.
+    """
+    frame = frame.copy()
+    fitting = preprocessing is None
+
+    # Normalize Relevant Numerical Columns
+    fill_values = frame[columns_to_normalize].mean().to_dict() if fitting else preprocessing['fill_values']
+    frame[columns_to_normalize] = frame[columns_to_normalize].fillna(fill_values)
+    co2_mpg_scaler = MinMaxScaler().fit(frame[columns_to_normalize]) if fitting else preprocessing['co2_mpg_scaler']
+    frame[columns_to_normalize] = co2_mpg_scaler.transform(frame[columns_to_normalize])
+
+    # Invert CO2 to align higher values with better sustainability
+    frame['Inverted CO2'] = 1 - frame['Real-World CO2 (g/mi)']
+
+    # Initializing the powertrain contribution columnn for each
+    frame['Powertrain Contribution'] = 0
+
+    # Calculate weighted sum for powertrain columns
+    for col, weight in powertrain_weights.items():
+        frame['Powertrain Contribution'] += frame[col] * weight
+
+    # Applying normalization to the Powertrain Contribution so that its not underepresented in the final score and has contribution proportional to the other features
+    powertrain_scaler = MinMaxScaler().fit(frame[['Powertrain Contribution']]) if fitting else preprocessing['powertrain_scaler']
+    frame['Powertrain Contribution'] = powertrain_scaler.transform(frame[['Powertrain Contribution']])
+
+    # Manually combine into Sustainability Score, a benchmark with which we can train the Random Forest Model and evaluate the values it predicts
+    frame['Sustainability Score'] = (
+        frame['Inverted CO2'] * score_weights['Inverted CO2'] +
+        frame['Ton-MPG (Real-World)'] * score_weights['Ton-MPG (Real-World)'] +
+        frame['Powertrain Contribution'] * score_weights['Powertrain Contribution']
+    )
+    return frame, {
+        'fill_values': fill_values,
+        'co2_mpg_scaler': co2_mpg_scaler,
+        'powertrain_scaler': powertrain_scaler,
+    }
+
+# Train the Random Forest on a held-out split and report its test error
+def train_random_forest(frame):
+    """Fit the Random Forest on the engineered frame and return it with its test MSE."""
+    X = frame[features]
+    y = frame['Sustainability Score']
+
+    # Split data into training and testing
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=42)
+
+    # Train Random Forest Model
+    random_forest = RandomForestRegressor(**random_forest_params)
+    random_forest.fit(X_train, y_train)
+
+    # Evaluate the Model
+    y_pred_test = random_forest.predict(X_test)
+    mse_test = mean_squared_error(y_test, y_pred_test)
+    return random_forest, mse_test
+
+# Load the trained model for the current data and configuration from the registry, training and storing it only when either has changed
+def load_or_train_model(frame, data_version):
+    """Return the engineered frame and the model artifact for `data_version`, training the model on a registry miss."""
+    key = artifact_key(data_version, model_config())
+    artifact = load_artifact(MODEL_NAME, key)
+    if artifact is not None:
+        frame, _ = engineer_features(frame, artifact)
+        return frame, artifact
+
+    frame, preprocessing = engineer_features(frame)
+    random_forest, mse_test = train_random_forest(frame)
+    artifact = {
+        'model': random_forest,
+        **preprocessing,
+        'features': features,
+        'powertrain_weights': powertrain_weights,
+        'mse_test': mse_test,
+        'data_version': data_version,
+        'config': model_config(),
+    }
+    save_artifact(MODEL_NAME, key, artifact)
+    return frame, artifact
+
+# Run the whole scoring pipeline once per process, on first use
+@lru_cache(maxsize=None)
+def _scoring_pipeline():
+    frame, artifact = load_or_train_model(get_specific_manufacturers_filtered(), dataset_version())
+
+    # Predict Sustainability Scores for All Data
+    frame['Predicted Sustainability Score'] = artifact['model'].predict(frame[artifact['features']])
+
+    return {
+        'artifact': artifact,
+        'scored_data': frame,
+        'aggregated_scores': aggregate_scores(frame),
+    }
+
+def get_trained_model():
+    """Return the model artifact: the fitted Random Forest, its fill values and scalers, features, powertrain weights and test MSE."""
+    return _scoring_pipeline()['artifact']
+
+# Scoring backends: the trained Random Forest, or the closed-form weighted sum it approximates
+SCORING_BACKENDS = ('random_forest', 'exact')
+DEFAULT_BACKEND = 'random_forest'
+
+def _check_backend(backend):
+    if backend not in SCORING_BACKENDS:
+        raise ValueError(f"Unknown scoring backend {backend!r}, expected one of {SCORING_BACKENDS}")
+
+def get_scored_data(backend=DEFAULT_BACKEND):
+    """Return a copy of the per-vehicle-type frame scored by the given backend."""
+    _check_backend(backend)
+    if backend == 'exact':
+        return get_exact_scored_data()
+    return _scoring_pipeline()['scored_data'].copy()
+
+def get_aggregated_scores(backend=DEFAULT_BACKEND):
+    """Return a copy of the yearly sustainability score per manufacturer from the given backend, computing it on first use."""
+    _check_backend(backend)
+    if backend == 'exact':
+        return get_exact_aggregated_scores()
+    return _scoring_pipeline()['aggregated_scores'].copy()
+
+# Group the yearly scores by manufacturer once per process, so single-manufacturer lookups slice instead of scanning
+@lru_cache(maxsize=None)
+def _scores_by_manufacturer(backend):
+    return group_by_manufacturer(get_aggregated_scores(backend))
+
+def get_scores_by_manufacturer(backend=DEFAULT_BACKEND):
+    """Return a dict mapping each manufacturer to a copy of its yearly scores sorted by Model Year."""
+    _check_backend(backend)
+    return {manufacturer: data.copy() for manufacturer, data in _scores_by_manufacturer(backend).items()}
+
+# Compare the yearly scores and scoring time of the two backends
+def backend_parity_report():
+    """Return a per manufacturer and year comparison of both backends, and a summary of their agreement and speed."""
+    frame = get_specific_manufacturers_filtered()
+    artifact = get_trained_model()
+
+    start = time.perf_counter()
+    engineered, _ = engineer_features(frame, artifact)
+    artifact['model'].predict(engineered[artifact['features']])
+    random_forest_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exact_sustainability_scores(frame, fit_score_bounds(frame))
+    exact_seconds = time.perf_counter() - start
+
+    random_forest_column = 'Yearly Sustainability Score (Random Forest)'
+    exact_column = 'Yearly Sustainability Score (Exact)'
+    comparison = get_aggregated_scores('random_forest').merge(
+        get_aggregated_scores('exact'), on=['Manufacturer', 'Model Year'], suffixes=(' (Random Forest)', ' (Exact)')
+    )
+    comparison['Absolute Difference'] = (comparison[random_forest_column] - comparison[exact_column]).abs()
 
-# # Sort features by importance
-# features_df = features_df.sort_values(by='Importance', ascending=False)
+    # A model year agrees when both backends rank its manufacturers in the same order
+    rank_agreement = comparison.groupby('Model Year')[[random_forest_column, exact_column]].apply(
+        lambda year: year[random_forest_column].rank().tolist() == year[exact_column].rank().tolist()
+    )
 
-# # Display the feature importance
-# print(features_df)
\ No newline at end of file
+    summary = {
+        'max_abs_difference': comparison['Absolute Difference'].max(),
+        'mean_abs_difference': comparison['Absolute Difference'].mean(),
+        'spearman_correlation': comparison[random_forest_column].corr(comparison[exact_column], method='spearman'),
+        'years_with_identical_ranking': f"{int(rank_agreement.sum())}/{len(rank_agreement)}",
+        'random_forest_seconds': random_forest_seconds,
+        'exact_seconds': exact_seconds,
+    }
+    return comparison, summary
+
+if __name__ == "__main__":
+    print(f"Random Forest Test MSE: {get_trained_model()['mse_test']}")
+
+    comparison, summary = backend_parity_report()
+    print("Random Forest vs exact scoring backend parity:")
+    for name, value in summary.items():
+        print(f"  {name}: {value}")
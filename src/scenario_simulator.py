@@ -0,0 +1,163 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from data_cleaning import powertrain_columns
+from sustainability_score import _min_max, get_exact_scored_data, get_score_bounds, powertrain_weights, score_weights
+
+# Full-form names used by the pages
+manufacturer_names = {'GM': 'General Motors', 'VW': 'Volkswagen'}
+
+# Powertrain that takes the share removed from a row whose mix has no other powertrain left to give it to
+FALLBACK_POWERTRAIN = 'Powertrain - Gasoline without Start/Stop'
+
+# Everything a scenario needs, precomputed once per process: the fitted bounds, the normalized CO2 and Ton-MPG terms
+# (which scenarios never change), the powertrain share matrix and the row -> (Manufacturer, Model Year) group codes
+@lru_cache(maxsize=None)
+def _scenario_base():
+    frame = get_exact_scored_data()
+    bounds = get_score_bounds()
+
+    co2 = frame['Real-World CO2 (g/mi)'].to_numpy(dtype=float)
+    ton_mpg = frame['Ton-MPG (Real-World)'].to_numpy(dtype=float)
+    co2 = np.where(np.isnan(co2), bounds['fill_values']['Real-World CO2 (g/mi)'], co2)
+    ton_mpg = np.where(np.isnan(ton_mpg), bounds['fill_values']['Ton-MPG (Real-World)'], ton_mpg)
+
+    manufacturers = frame['Manufacturer'].replace(manufacturer_names).to_numpy()
+    codes, group_keys = pd.factorize(pd.MultiIndex.from_arrays([manufacturers, frame['Model Year'].to_numpy()]))
+    return {
+        'bounds': bounds,
+        'inverted_co2': 1 - _min_max(co2, bounds['Real-World CO2 (g/mi)']),
+        'ton_mpg': _min_max(ton_mpg, bounds['Ton-MPG (Real-World)']),
+        'shares': frame[powertrain_columns].to_numpy(dtype=float),
+        'codes': codes,
+        'counts': np.bincount(codes),
+        'group_keys': group_keys.to_frame(index=False, name=['Manufacturer', 'Model Year']),
+    }
+
+def available_years():
+    """Return the model years a scenario can be run for, newest first."""
+    return sorted((int(year) for year in _scenario_base()['group_keys']['Model Year'].unique()), reverse=True)
+
+def baseline_mix(manufacturer, model_year):
+    """Return the manufacturer's mean powertrain shares for the year, keyed by powertrain column."""
+    base = _scenario_base()
+    rows = _group_rows(base, manufacturer, model_year)
+    return dict(zip(powertrain_columns, base['shares'][rows].mean(axis=0).tolist()))
+
+def _group_rows(base, manufacturer, model_year):
+    keys = base['group_keys']
+    match = np.flatnonzero((keys['Manufacturer'] == manufacturer).to_numpy() & (keys['Model Year'] == model_year).to_numpy())
+    if not len(match):
+        raise ValueError(f"No EPA data for {manufacturer} in {model_year}")
+    return base['codes'] == match[0]
+
+# Move some powertrain shares by a number of percentage points, taking the difference from (or giving it to) the
+# other powertrains in proportion to their current share, so every row's mix still adds up to the same total. A row
+# with no other powertrain, such as an all-BEV Tesla row, gives the removed share to FALLBACK_POWERTRAIN.
+def shift_powertrain_mix(shares, share_changes):
+    """Return a copy of the (rows x powertrains) share matrix with `share_changes` applied.
+
+    Raises ValueError when a row's removed share has nowhere to go because the fallback powertrain is itself shifted.
+    """
+    shares = shares.copy()
+    totals = shares.sum(axis=1)
+    changed = np.isin(powertrain_columns, list(share_changes))
+
+    for col, change in share_changes.items():
+        index = powertrain_columns.index(col)
+        shares[:, index] = np.clip(shares[:, index] + change, 0, totals)
+
+    # Several increases together can't take more than the whole mix
+    changed_total = shares[:, changed].sum(axis=1)
+    over = changed_total > totals
+    shares[np.ix_(over, changed)] *= (totals[over] / changed_total[over])[:, None]
+    changed_total = np.minimum(changed_total, totals)
+
+    others_total = shares[:, ~changed].sum(axis=1)
+    stranded = (others_total <= 0) & (totals - changed_total > 1e-12)
+    if stranded.any():
+        fallback = powertrain_columns.index(FALLBACK_POWERTRAIN)
+        if changed[fallback]:
+            raise ValueError(
+                f"{stranded.sum()} rows have no unchanged powertrain to take the share removed by {share_changes}"
+            )
+        shares[stranded, fallback] = (totals - changed_total)[stranded]
+        others_total = shares[:, ~changed].sum(axis=1)
+    scale = np.divide(totals - changed_total, others_total, out=np.zeros_like(totals), where=others_total > 0)
+    shares[:, ~changed] *= scale[:, None]
+    return shares
+
+# Per-row scores for a share matrix, with the CO2 and Ton-MPG terms held at their fitted values
+def _row_scores(base, shares, weights_vector, contribution_bounds, weights):
+    contribution = _min_max(shares @ weights_vector, contribution_bounds)
+    return (
+        base['inverted_co2'] * weights['Inverted CO2'] +
+        base['ton_mpg'] * weights['Ton-MPG (Real-World)'] +
+        contribution * weights['Powertrain Contribution']
+    )
+
+# Yearly 0-100 scores per (Manufacturer, Model Year) group, normalized with a fixed score range
+def _yearly_scores(base, row_scores, score_range):
+    low, high = score_range
+    normalized = 100 * (row_scores - low) / (high - low)
+    return np.bincount(base['codes'], weights=normalized) / base['counts']
+
+def simulate(manufacturer, model_year, share_changes=None, powertrain_weight_overrides=None, score_weight_overrides=None):
+    """Recompute a manufacturer's yearly score and rank under a what-if powertrain mix and/or weighting.
+
+    `share_changes` maps powertrain columns to percentage-point changes (0.2 = +20 points) applied to the
+    manufacturer's rows for `model_year`; the weight overrides replace entries of the powertrain and score
+    weights for every manufacturer. Scores stay on the dashboard's 0-100 scale because the normalization
+    bounds are fitted on the unmodified fleet, so a shifted mix can score above 100.
+    """
+    base = _scenario_base()
+    weights = {**powertrain_weights, **(powertrain_weight_overrides or {})}
+    combined_weights = {**score_weights, **(score_weight_overrides or {})}
+    weights_vector = np.array([weights[col] for col in powertrain_columns])
+
+    # The stored Powertrain Contribution bounds only hold for the stored weights; new weights refit them on the fleet
+    if powertrain_weight_overrides:
+        reference_contribution = base['shares'] @ weights_vector
+        contribution_bounds = (reference_contribution.min(), reference_contribution.max())
+    else:
+        contribution_bounds = base['bounds']['Powertrain Contribution']
+
+    reference = _row_scores(base, base['shares'], weights_vector, contribution_bounds, combined_weights)
+    score_range = (reference.min(), reference.max())
+
+    rows = _group_rows(base, manufacturer, model_year)
+    shares = base['shares']
+    if share_changes:
+        shares = shares.copy()
+        shares[rows] = shift_powertrain_mix(shares[rows], share_changes)
+
+    scenario = _row_scores(base, shares, weights_vector, contribution_bounds, combined_weights)
+
+    # Rank the manufacturer against everyone else with data for the same year (1 = most sustainable)
+    year_scores = base['group_keys'].assign(**{
+        'Baseline Score': _yearly_scores(base, reference, score_range),
+        'Scenario Score': _yearly_scores(base, scenario, score_range),
+    })
+    year_scores = year_scores[year_scores['Model Year'] == model_year].drop(columns='Model Year')
+    year_scores['Baseline Rank'] = year_scores['Baseline Score'].rank(ascending=False, method='min').astype(int)
+    year_scores['Scenario Rank'] = year_scores['Scenario Score'].rank(ascending=False, method='min').astype(int)
+    year_scores = year_scores.sort_values('Scenario Rank').reset_index(drop=True)
+
+    selected = year_scores[year_scores['Manufacturer'] == manufacturer].iloc[0]
+    return {
+        'baseline_score': float(selected['Baseline Score']),
+        'scenario_score': float(selected['Scenario Score']),
+        'baseline_rank': int(selected['Baseline Rank']),
+        'scenario_rank': int(selected['Scenario Rank']),
+        'manufacturers_ranked': len(year_scores),
+        'year_scores': year_scores,
+    }
+
+if __name__ == "__main__":
+    import time
+    simulate('Toyota', 2024)  # Warm the in-memory base
+    start = time.perf_counter()
+    result = simulate('Toyota', 2024, {'Powertrain - Battery Electric Vehicle (BEV)': 0.2})
+    elapsed_ms = 1000 * (time.perf_counter() - start)
+    print(f"Toyota 2024 with +20 points of BEV: {result['baseline_score']:.2f} (rank {result['baseline_rank']}) -> "
+          f"{result['scenario_score']:.2f} (rank {result['scenario_rank']} of {result['manufacturers_ranked']}) in {elapsed_ms:.1f} ms")
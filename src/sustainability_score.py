@@ -0,0 +1,120 @@
+import numpy as np
+from functools import lru_cache
+from data_processing import get_specific_manufacturers_filtered
+from data_cleaning import powertrain_columns
+
+# Relevant numerical columns that get normalized before scoring
+columns_to_normalize = ['Real-World CO2 (g/mi)', 'Ton-MPG (Real-World)']
+
+# Assign weights to powertrain columns according to their contribution to sustainability, and make sure they add up to 1
+powertrain_weights = {
+    'Powertrain - Diesel': 0.000,  # No contribution due to high emissions
+    'Powertrain - Battery Electric Vehicle (BEV)': 0.35,  # Highest positive weight for sustainability
+    'Powertrain - Plug-in Hybrid Electric Vehicle (PHEV)': 0.25,  # Transitional technology
+    'Powertrain - Fuel Cell Electric Vehicle (FCEV)': 0.20,  # Promising but less widespread
+    'Powertrain - Other (incl. CNG)': 0.03,  # Moderate weight for cleaner alternatives
+    'Powertrain - Gasoline Mild Hybrid/MHEV': 0.07,  # Small positive impact
+    'Powertrain - Gasoline Strong Hybrid/HEV': 0.10,  # Stronger hybrid sustainability
+    'Powertrain - Gasoline with Start/Stop': 0.00,  # No contribution to sustainability
+    'Powertrain - Gasoline without Start/Stop': 0.000  # No contribution due to inefficiency
+}
+
+# Weights combining the normalized metrics into the Sustainability Score
+score_weights = {
+    'Inverted CO2': 0.4,
+    'Ton-MPG (Real-World)': 0.3,
+    'Powertrain Contribution': 0.3
+}
+
+# Weighted sum of the powertrain shares, as one matrix-vector product over the whole frame
+def powertrain_contribution(frame, powertrain_weights=powertrain_weights):
+    """Return the raw (unnormalized) Powertrain Contribution of every row as an array."""
+    weights = np.array([powertrain_weights[col] for col in powertrain_columns])
+    return frame[powertrain_columns].to_numpy(dtype=float) @ weights
+
+# Fit the fill values and MinMax bounds the closed-form score normalizes with
+def fit_score_bounds(frame, powertrain_weights=powertrain_weights):
+    """Return the mean fill values and the (min, max) bounds of CO2, Ton-MPG and the Powertrain Contribution."""
+    fill_values = {col: float(np.nanmean(frame[col].to_numpy(dtype=float))) for col in columns_to_normalize}
+    bounds = {'fill_values': fill_values}
+    for col in columns_to_normalize:
+        values = frame[col].to_numpy(dtype=float)
+        values = np.where(np.isnan(values), fill_values[col], values)
+        bounds[col] = (float(values.min()), float(values.max()))
+
+    contribution = powertrain_contribution(frame, powertrain_weights)
+    bounds['Powertrain Contribution'] = (float(contribution.min()), float(contribution.max()))
+    return bounds
+
+# Scale values to [0, 1] with fixed bounds, treating a zero range like MinMaxScaler does
+def _min_max(values, bounds):
+    low, high = bounds
+    value_range = high - low
+    return (values - low) / (value_range if value_range != 0 else 1.0)
+
+# Closed-form Sustainability Score, the same weighted sum the Random Forest is trained to approximate
+def exact_sustainability_scores(frame, bounds, powertrain_weights=powertrain_weights, score_weights=score_weights):
+    """Return the Sustainability Score of every row computed directly with NumPy."""
+    co2 = frame['Real-World CO2 (g/mi)'].to_numpy(dtype=float)
+    ton_mpg = frame['Ton-MPG (Real-World)'].to_numpy(dtype=float)
+    co2 = np.where(np.isnan(co2), bounds['fill_values']['Real-World CO2 (g/mi)'], co2)
+    ton_mpg = np.where(np.isnan(ton_mpg), bounds['fill_values']['Ton-MPG (Real-World)'], ton_mpg)
+
+    inverted_co2 = 1 - _min_max(co2, bounds['Real-World CO2 (g/mi)'])
+    ton_mpg = _min_max(ton_mpg, bounds['Ton-MPG (Real-World)'])
+    contribution = _min_max(powertrain_contribution(frame, powertrain_weights), bounds['Powertrain Contribution'])
+
+    return (
+        inverted_co2 * score_weights['Inverted CO2'] +
+        ton_mpg * score_weights['Ton-MPG (Real-World)'] +
+        contribution * score_weights['Powertrain Contribution']
+    )
+
+# Group the per-vehicle-type scores into one normalized score per manufacturer and year
+def aggregate_scores(frame, score_column='Predicted Sustainability Score'):
+    """Normalize `score_column` to [0, 100] and average it per Manufacturer and Model Year."""
+    predicted = frame[score_column]
+
+    # Normalize scores to [0, 100]
+    normalized = frame.assign(**{
+        'Sustainability Score (Normalized)': 100 * (predicted - predicted.min()) / (predicted.max() - predicted.min())
+    })
+
+    # Group by Manufacturer and Model Year to retain scores for each year
+    aggregated_scores = normalized.groupby(
+        ['Manufacturer', 'Model Year'], as_index=False
+    ).agg({'Sustainability Score (Normalized)': 'mean'})
+
+    # Rename the column to make it more descriptive
+    aggregated_scores.rename(columns={'Sustainability Score (Normalized)': 'Yearly Sustainability Score'}, inplace=True)
+
+    # Renaming VW and GM to their full form Manufacturer Names
+    aggregated_scores['Manufacturer'] = aggregated_scores['Manufacturer'].replace({
+        'GM': 'General Motors',
+        'VW': 'Volkswagen'
+    })
+    return aggregated_scores
+
+# Score the whole dataset with the closed form once per process, on first use
+@lru_cache(maxsize=None)
+def _exact_pipeline():
+    frame = get_specific_manufacturers_filtered()
+    bounds = fit_score_bounds(frame)
+    frame['Sustainability Score'] = exact_sustainability_scores(frame, bounds)
+    return {
+        'bounds': bounds,
+        'scored_data': frame,
+        'aggregated_scores': aggregate_scores(frame, score_column='Sustainability Score'),
+    }
+
+def get_score_bounds():
+    """Return the fill values and MinMax bounds fitted on the full dataset."""
+    return _exact_pipeline()['bounds']
+
+def get_exact_scored_data():
+    """Return a copy of the per-vehicle-type frame with its closed-form Sustainability Score."""
+    return _exact_pipeline()['scored_data'].copy()
+
+def get_exact_aggregated_scores():
+    """Return a copy of the yearly sustainability score per manufacturer, computed with the closed form."""
+    return _exact_pipeline()['aggregated_scores'].copy()
@@ -1,53 +1,57 @@
-from data_processing import specific_manufacturers_filtered
+from data_processing import get_specific_manufacturers_filtered
+from chart_rendering import N_JOBS, chart_job, print_render_report, render_charts
+from manufacturer_index import group_by_manufacturer
 import os
-import pandas as pd
+import time
 import matplotlib.pyplot as plt
 
-# Convert Real-World CO2 and Real-World MPG columns to numeric, coercing errors to NaN
-specific_manufacturers_filtered['Real-World CO2 (g/mi)'] = pd.to_numeric(
-    specific_manufacturers_filtered['Real-World CO2 (g/mi)'], errors='coerce'
-)
-specific_manufacturers_filtered['Real-World MPG'] = pd.to_numeric(
-    specific_manufacturers_filtered['Real-World MPG'], errors='coerce'
-)
-
-# Interpolate missing values (NaN) in Real-World CO2 and Real-World MPG columns
-specific_manufacturers_filtered['Real-World CO2 (g/mi)'] = specific_manufacturers_filtered['Real-World CO2 (g/mi)'].interpolate(method='linear')
-specific_manufacturers_filtered['Real-World MPG'] = specific_manufacturers_filtered['Real-World MPG'].interpolate(method='linear')
-
-# Remove invalid rows (negative or zero values)
-specific_manufacturers_filtered = specific_manufacturers_filtered[
-    (specific_manufacturers_filtered['Real-World CO2 (g/mi)'] > 0) &
-    (specific_manufacturers_filtered['Real-World MPG'] > 0)
-]
-
-# Renaming GM and VW to their full form names
-specific_manufacturers_filtered['Manufacturer'] = specific_manufacturers_filtered['Manufacturer'].replace({
-    'GM': 'General Motors',
-    'VW': 'Volkswagen'
-})
-
 # Directory to save the plots
 plots_dir = "manufacturer_co2_mpg_plots"
-os.makedirs(plots_dir, exist_ok=True)
 
-# Iterate through each manufacturer and generate the plots
-for manufacturer in specific_manufacturers_filtered['Manufacturer'].unique():
-    # Filter data for the manufacturer
-    manufacturer_data = specific_manufacturers_filtered[
-        specific_manufacturers_filtered['Manufacturer'] == manufacturer
-    ]
+# File name of each chart type, relative to plots_dir
+chart_files = {
+    'co2': "{manufacturer}_co2_plot.png",
+    'mpg': "{manufacturer}_mpg_plot.png",
+}
+
+def chart_path(chart_type, manufacturer, plots_dir=plots_dir):
+    """Return the file path of one manufacturer's chart."""
+    return os.path.join(plots_dir, chart_files[chart_type].format(manufacturer=manufacturer))
+
+# Prepare the CO2 and MPG data used by the plots
+def prepare_co2_mpg_data(emissions_data=None):
+    """Return the filtered EPA data (the default CSV's unless given) with interpolated CO2/MPG, invalid rows removed and full manufacturer names."""
+    specific_manufacturers_filtered = get_specific_manufacturers_filtered() if emissions_data is None else emissions_data.copy()
+
+    # Interpolate missing values (NaN) in Real-World CO2 and Real-World MPG columns
+    specific_manufacturers_filtered['Real-World CO2 (g/mi)'] = specific_manufacturers_filtered['Real-World CO2 (g/mi)'].interpolate(method='linear')
+    specific_manufacturers_filtered['Real-World MPG'] = specific_manufacturers_filtered['Real-World MPG'].interpolate(method='linear')
 
-    # Ensure data is sorted by Model Year
-    manufacturer_data = manufacturer_data.sort_values(by='Model Year')
+    # Remove invalid rows (negative or zero values)
+    specific_manufacturers_filtered = specific_manufacturers_filtered[
+        (specific_manufacturers_filtered['Real-World CO2 (g/mi)'] > 0) &
+        (specific_manufacturers_filtered['Real-World MPG'] > 0)
+    ].copy()
 
+    # Renaming GM and VW to their full form names
+    specific_manufacturers_filtered['Manufacturer'] = specific_manufacturers_filtered['Manufacturer'].replace({
+        'GM': 'General Motors',
+        'VW': 'Volkswagen'
+    })
+    return specific_manufacturers_filtered
+
+# Average the CO2 and MPG of a manufacturer's vehicle types for each model year
+def yearly_co2_mpg(manufacturer_data):
+    """Return one row per model year with the mean Real-World CO2 and MPG of one manufacturer's rows."""
     # Aggregate both Real-World CO2 and Real-World MPG
-    manufacturer_data = manufacturer_data.groupby('Model Year', as_index=False).agg({
+    return manufacturer_data.groupby('Model Year', as_index=False).agg({
         'Real-World CO2 (g/mi)': 'mean',
         'Real-World MPG': 'mean'
     })
 
-    # Plot 1: Real-World CO2 (g/mi) over time
+# Plot 1: Real-World CO2 (g/mi) over time
+def plot_co2(manufacturer, manufacturer_data, plots_dir=plots_dir):
+    """Save the manufacturer's yearly Real-World CO2 line plot."""
     fig, ax = plt.subplots(figsize=(12, 5))  # Slightly larger aspect ratio
     ax.set_facecolor('none')  # Transparent axes background
     fig.patch.set_alpha(0)  # Transparent figure background
@@ -80,10 +84,12 @@ for manufacturer in specific_manufacturers_filtered['Manufacturer'].unique():
 
     # Optimize space and save
     plt.tight_layout()  # Ensure graph fills the image
-    fig.savefig(f"{plots_dir}/{manufacturer}_co2_plot.png", dpi=300, transparent=True, bbox_inches='tight')
+    fig.savefig(chart_path('co2', manufacturer, plots_dir), dpi=300, transparent=True, bbox_inches='tight')
     plt.close(fig)
 
-    # Plot 2: Real-World MPG over time
+# Plot 2: Real-World MPG over time
+def plot_mpg(manufacturer, manufacturer_data, plots_dir=plots_dir):
+    """Save the manufacturer's yearly Real-World MPG line plot."""
     fig, ax = plt.subplots(figsize=(12, 5))  # Slightly larger aspect ratio
     ax.set_facecolor('none')  # Transparent axes background
     fig.patch.set_alpha(0)  # Transparent figure background
@@ -116,7 +122,26 @@ for manufacturer in specific_manufacturers_filtered['Manufacturer'].unique():
 
     # Optimize space and save
     plt.tight_layout()  # Ensure graph fills the image
-    fig.savefig(f"{plots_dir}/{manufacturer}_mpg_plot.png", dpi=300, transparent=True, bbox_inches='tight')
+    fig.savefig(chart_path('mpg', manufacturer, plots_dir), dpi=300, transparent=True, bbox_inches='tight')
     plt.close(fig)
 
-    print(f"Updated transparent plots for {manufacturer} saved successfully!")
\ No newline at end of file
+# One CO2 and one MPG chart job per manufacturer
+def chart_jobs(manufacturers=None, emissions_data=None):
+    """Return the CO2 and MPG chart jobs for the given manufacturers, or for every manufacturer by default."""
+    jobs = []
+    for manufacturer, manufacturer_data in group_by_manufacturer(prepare_co2_mpg_data(emissions_data)).items():
+        if manufacturers is not None and manufacturer not in manufacturers:
+            continue
+        manufacturer_data = yearly_co2_mpg(manufacturer_data)
+        jobs.append(chart_job('co2', manufacturer, chart_path('co2', manufacturer), plot_co2, manufacturer, manufacturer_data))
+        jobs.append(chart_job('mpg', manufacturer, chart_path('mpg', manufacturer), plot_mpg, manufacturer, manufacturer_data))
+    return jobs
+
+def main(manufacturers=None, emissions_data=None, n_jobs=N_JOBS):
+    """Regenerate the CO2 and MPG plots for the given manufacturers, or for every manufacturer by default."""
+    start = time.perf_counter()
+    report = render_charts(chart_jobs(manufacturers, emissions_data), n_jobs)
+    print_render_report(report, time.perf_counter() - start)
+
+if __name__ == "__main__":
+    main()
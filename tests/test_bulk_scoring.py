@@ -0,0 +1,28 @@
+import os
+import sys
+import pandas as pd
+import pytest
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(REPO_ROOT, "src"))
+from bulk_scoring import required_columns, score_file
+from data_processing import EMISSIONS_CSV
+
+pytest.importorskip("pyarrow")
+
+# A pass-through column that is blank in every row of the first chunk must still take the values of later chunks
+def test_parquet_output_keeps_columns_blank_in_the_first_chunk(tmp_path, monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
+    rows = pd.read_csv(EMISSIONS_CSV, dtype=str, nrows=6)[required_columns]
+    rows['Extra'] = [None, None, None, 'a', None, 'b']
+    input_path = tmp_path / "fleet.csv"
+    rows.to_csv(input_path, index=False)
+
+    output_path = tmp_path / "scores.parquet"
+    scored_rows, _ = score_file(str(input_path), str(output_path), backend='exact', chunksize=3)
+
+    scored = pd.read_parquet(output_path)
+    assert scored_rows == len(scored) == 6
+    assert scored['Extra'].tolist() == [None, None, None, 'a', None, 'b']
+    assert scored['Sustainability Score'].dtype == float
+    assert scored['Sustainability Score'].notna().all()
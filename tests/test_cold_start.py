@@ -0,0 +1,12 @@
+import os
+import sys
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from cold_start import COLD_START_BUDGETS, check_cold_start
+
+# Every page and src module with a budget must load within it, in a fresh interpreter, without pulling in torch,
+# transformers or prophet
+@pytest.mark.parametrize("target", list(COLD_START_BUDGETS))
+def test_cold_start_within_budget(target):
+    check_cold_start(target)
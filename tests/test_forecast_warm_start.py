@@ -0,0 +1,22 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(REPO_ROOT, "src"))
+from future_predictions import forecast_series, prepare_series, split_by_manufacturer
+from sustainability_score import get_exact_aggregated_scores
+
+pytest.importorskip("prophet")
+
+# Once a year is appended, a fit warm-started from the previous year's parameters must forecast what a cold fit of
+# the same series does, for every manufacturer, including those whose posterior has a flat ridge (such as Mercedes)
+def test_warm_start_matches_cold_fit_after_appended_year(monkeypatch):
+    monkeypatch.chdir(REPO_ROOT)
+    for manufacturer, data in split_by_manufacturer(get_exact_aggregated_scores()).items():
+        series = prepare_series(data)
+        _, previous_params = forecast_series(series.iloc[:-1])
+        warm, _ = forecast_series(series, previous_params)
+        cold, _ = forecast_series(series)
+        np.testing.assert_allclose(warm['yhat'], cold['yhat'], atol=0.25, err_msg=manufacturer)
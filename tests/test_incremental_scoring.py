@@ -0,0 +1,47 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(os.path.join(REPO_ROOT, "src"))
+from data_cleaning import parse_epa_numeric
+from data_processing import EMISSIONS_CSV, dataset_version, load_specific_manufacturers_filtered
+from incremental_scoring import rescore
+from model_registry import artifact_key, load_artifact
+from random_forest_model import MODEL_NAME, engineer_features, model_config
+from sustainability_score import aggregate_scores, columns_to_normalize
+
+# Appending a year whose rows are all complete moves the mean fill values, which must only rescore the groups with a
+# missing value instead of forcing a retrain; the registered model must then reproduce the incremental scores
+def test_appending_a_complete_year_rescores_incrementally(tmp_path, monkeypatch):
+    raw = pd.read_csv(os.path.join(REPO_ROOT, EMISSIONS_CSV), dtype=str)
+    monkeypatch.chdir(tmp_path)
+
+    # The appended year repeats the complete rows of 2023, so it stays within the stored MinMax bounds
+    complete = raw[columns_to_normalize].apply(parse_epa_numeric).notna().all(axis=1)
+    appended = raw[(raw['Model Year'] == '2023') & complete].assign(**{'Model Year': '2025'})
+    csv_path = str(tmp_path / "emissions_data.csv")
+    state_path = str(tmp_path / "state.joblib")
+
+    raw.to_csv(csv_path, index=False)
+    _, report = rescore(csv_path, state_path)
+    assert report['mode'] == 'full'
+
+    pd.concat([raw, appended], ignore_index=True).to_csv(csv_path, index=False)
+    aggregated_scores, report = rescore(csv_path, state_path)
+    assert report['mode'] == 'incremental', report.get('reason')
+    assert report['fill_value_shifts']
+    assert {year for _, year in report['new_groups']} == {2025}
+
+    frame = load_specific_manufacturers_filtered(csv_path)
+    artifact = load_artifact(MODEL_NAME, artifact_key(dataset_version(csv_path), model_config()))
+    engineered, _ = engineer_features(frame, artifact)
+    expected = aggregate_scores(engineered.assign(**{
+        'Predicted Sustainability Score': artifact['model'].predict(engineered[artifact['features']])
+    }))
+    merged = expected.merge(aggregated_scores, on=['Manufacturer', 'Model Year'], suffixes=(' (Full)', ' (Incremental)'))
+    assert len(merged) == len(expected) == len(aggregated_scores)
+    np.testing.assert_allclose(
+        merged['Yearly Sustainability Score (Full)'], merged['Yearly Sustainability Score (Incremental)'], rtol=1e-12
+    )
@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from ai_sentiment_analysis import filter_paragraphs, keyword_matcher
+
+# Lines about electrified powertrains are core EV content, whichever acronym they use
+def test_powertrain_acronyms_are_kept():
+    lines = [
+        "Our BEV sales doubled last year",
+        "PHEVs now make up a fifth of deliveries",
+        "A new HEV joins the lineup",
+        "Every xEV model shares one platform",
+        "EV charging is free for a year",
+    ]
+    paragraphs, dropped = filter_paragraphs("\n".join(lines))
+    assert paragraphs == lines
+    assert dropped == 0
+
+# "ev" and the acronyms only match as whole words, so words that merely contain them are dropped
+def test_short_keywords_only_match_whole_words():
+    paragraphs, dropped = filter_paragraphs("Every development\nThe chevron logo\nPrevious results")
+    assert paragraphs == []
+    assert dropped == 3
+
+# Keyword sets can be given as lists; equal sets share one compiled pattern
+def test_keyword_matcher_accepts_lists():
+    matcher = keyword_matcher(["carbon"], ["ev"])
+    assert matcher is keyword_matcher(("carbon",), ("ev",))
+    assert matcher.search("low-carbon steel") and matcher.search("an ev") and not matcher.search("every")
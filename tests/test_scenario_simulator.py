@@ -0,0 +1,36 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from data_cleaning import powertrain_columns
+from scenario_simulator import FALLBACK_POWERTRAIN, shift_powertrain_mix
+
+BEV = 'Powertrain - Battery Electric Vehicle (BEV)'
+
+def _mix(**shares):
+    row = np.zeros(len(powertrain_columns))
+    for col, share in shares.items():
+        row[powertrain_columns.index(col)] = share
+    return row[None, :]
+
+# An all-BEV mix has no other powertrain to take the removed share, so it goes to the fallback instead of vanishing
+def test_share_removed_from_a_single_powertrain_mix_goes_to_the_fallback():
+    shifted = shift_powertrain_mix(_mix(**{BEV: 1.0}), {BEV: -1.0})
+    np.testing.assert_allclose(shifted.sum(axis=1), [1.0])
+    np.testing.assert_allclose(shifted, _mix(**{FALLBACK_POWERTRAIN: 1.0}))
+
+    shifted = shift_powertrain_mix(_mix(**{BEV: 1.0}), {BEV: -0.25})
+    np.testing.assert_allclose(shifted, _mix(**{BEV: 0.75, FALLBACK_POWERTRAIN: 0.25}))
+
+# When the fallback is itself shifted, the removed share has nowhere to go
+def test_shift_without_any_receiving_powertrain_is_rejected():
+    with pytest.raises(ValueError):
+        shift_powertrain_mix(_mix(**{BEV: 1.0}), {BEV: -0.5, FALLBACK_POWERTRAIN: 0.0})
+
+# A mix with other powertrains keeps sharing the change among them in proportion to their shares
+def test_other_powertrains_take_the_change_in_proportion():
+    mix = _mix(**{BEV: 0.5, FALLBACK_POWERTRAIN: 0.3, 'Powertrain - Diesel': 0.2})
+    shifted = shift_powertrain_mix(mix, {BEV: -0.5})
+    np.testing.assert_allclose(shifted, _mix(**{FALLBACK_POWERTRAIN: 0.6, 'Powertrain - Diesel': 0.4}))
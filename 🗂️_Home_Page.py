@@ -1,6 +1,14 @@
 import streamlit as st
 from PIL import Image
 import os
+import sys
+
+# Add src folder to system path, as it's in a different folder from this file
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "src")))
+
+# Charts are shown from their display-size variants when the build has written them
+from image_assets import display_variant
+from chart_data import comparative_boxplot_spec, load_chart_data, sustainability_growth_spec
 
 # Set the page configuration
 st.set_page_config(page_title="Home - Carbon Lens", page_icon="♻️", layout="wide")
@@ -37,13 +45,21 @@ By focusing on reducing emissions and improving efficiency, manufacturers can:
 st.header("📊 Key Visual Insights")
 st.markdown("Below are some overall insights into manufacturers' sustainability efforts.")
 
+# Interactive charts are drawn in the browser from a few KB of chart data; the static images are the pre-rendered PNGs
+chart_mode = st.radio("Chart mode:", ("Static images", "Interactive charts"), horizontal=True)
+chart_data = load_chart_data() if chart_mode == "Interactive charts" else None
+if chart_mode == "Interactive charts" and chart_data is None:
+    st.warning("Interactive chart data not found, showing the static images instead. Run `python src/chart_data.py` to build it.")
+
 # Display Comparative Boxplot
 st.subheader("Comparative Sustainability Score Boxplot")
 boxplot_path = "manufacturer_advanced_visuals/comparative_sustainability_boxplot.png"
 col1, col2 = st.columns([2, 0.5])
 with col1:
-    if os.path.exists(boxplot_path):
-        st.image(boxplot_path, width=1500)
+    if chart_data is not None:
+        st.vega_lite_chart(chart_data['scores'], comparative_boxplot_spec(), width="stretch")
+    elif os.path.exists(boxplot_path):
+        st.image(display_variant(boxplot_path, 1500), width=1500)
     else:
         st.error(f"Plot not found: {boxplot_path}")
 with col2:
@@ -65,8 +81,10 @@ top_efforts_path = "manufacturer_advanced_visuals/all_manufacturers_sustainabili
 
 col1, col2 = st.columns([2, 0.5])
 with col1:
-    if os.path.exists(top_efforts_path):
-        st.image(top_efforts_path, width=1500)
+    if chart_data is not None:
+        st.vega_lite_chart(chart_data['scores'], sustainability_growth_spec(), width="stretch")
+    elif os.path.exists(top_efforts_path):
+        st.image(display_variant(top_efforts_path, 1500), width=1500)
     else:
         st.error(f"Plot not found: {top_efforts_path}")
 with col2: